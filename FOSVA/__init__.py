@@ -1,11 +1,22 @@
-from .fosva import fosva, update_nu, piecewise_function, multi_fosva
-from .fosva_ato import compute_gradient, run_multifosva_ato
+from .concave_pwl import ConcavePWL, ConcavePWLBatch
+from utils.piecewise import PiecewiseLinear, PiecewiseLinearSet
+from .fosva import fosva, update_nu, merge_breakpoints, piecewise_function, multi_fosva
+from .fosva_ato import compute_gradient, compute_gradient_rhs, compute_gradient_dual, ParallelGradient, BatchGradient, run_multifosva_ato
 
 __all__ = [
+    "ConcavePWL",
+    "ConcavePWLBatch",
     "fosva",
     "multi_fosva",
     "update_nu",
+    "merge_breakpoints",
     "piecewise_function",
+    "PiecewiseLinear",
+    "PiecewiseLinearSet",
     "compute_gradient",
+    "compute_gradient_rhs",
+    "compute_gradient_dual",
+    "ParallelGradient",
+    "BatchGradient",
     "run_multifosva_ato"
 ]
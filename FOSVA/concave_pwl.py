@@ -0,0 +1,198 @@
+import numpy as np
+
+
+class ConcavePWL():
+    """
+    Concave piecewise linear function learnt by FOSVA.
+    The breakpoints and the slopes are kept in sorted numpy arrays with spare capacity, such that
+    a new breakpoint is located by searchsorted and inserted by shifting the tail of the arrays,
+    while the update of the slopes (and the projection on non-increasing slopes) is vectorized.
+    The slope slopes[k] holds between breaks[k] and breaks[k+1], the last one up to infinity.
+    """
+    def __init__(self, breaks=(0.0,), slopes=(0.0,), capacity=64):
+        n = len(breaks)
+        self.n = n
+        self._breaks = np.zeros(max(capacity, n))
+        self._slopes = np.zeros(max(capacity, n))
+        self._breaks[:n] = breaks
+        self._slopes[:n] = slopes
+
+    @property
+    def breaks(self):
+        return self._breaks[:self.n]
+
+    @property
+    def slopes(self):
+        return self._slopes[:self.n]
+
+    def insert(self, s):
+        """
+        It adds the breakpoint s (if not already present), with the slope of the segment it falls in
+        (the last slope if s is before the first breakpoint, as in update_nu).
+        :return: the position of s
+        """
+        pos = int(np.searchsorted(self.breaks, s))
+        if pos < self.n and self._breaks[pos] == s:
+            return pos
+        if self.n == self._breaks.size:
+            # no spare capacity, the arrays are doubled
+            self._breaks = np.concatenate((self._breaks, np.zeros(self.n)))
+            self._slopes = np.concatenate((self._slopes, np.zeros(self.n)))
+        slope = self._slopes[pos - 1] if pos > 0 else self._slopes[self.n - 1]
+        self._breaks[pos + 1:self.n + 1] = self._breaks[pos:self.n]
+        self._slopes[pos + 1:self.n + 1] = self._slopes[pos:self.n]
+        self._breaks[pos] = s
+        self._slopes[pos] = slope
+        self.n += 1
+        return pos
+
+    def update(self, s, alpha, pi_m, pi_p):
+        """
+        One FOSVA iteration: the breakpoint s is added and the slopes are moved (with step alpha)
+        towards the right slope pi_p on the left of s and towards the left slope pi_m from s on,
+        only where this keeps them non-increasing.
+        """
+        pos = self.insert(s)
+        left = self._slopes[:pos]
+        right = self._slopes[pos:self.n]
+        np.maximum(left, (1 - alpha) * left + alpha * pi_p, out=left)
+        np.minimum(right, (1 - alpha) * right + alpha * pi_m, out=right)
+
+    def merge(self, max_breakpoints):
+        """
+        It merges neighbouring segments until there are at most max_breakpoints breakpoints.
+        The two merged segments are replaced by one segment whose slope is their average weighted by the lengths,
+        hence the function keeps its value at the remaining breakpoints and, since the slopes are non-increasing,
+        it is still concave. At each step, the merged pair is the one with the smallest error,
+        i.e., with the smallest slope difference times the harmonic mean of the lengths.
+        The last segment is unbounded, so it is never merged.
+        """
+        if max_breakpoints < 2:
+            raise ValueError('At least two breakpoints are required')
+        while self.n > max_breakpoints:
+            nu = self.slopes
+            # lengths of the bounded segments
+            length = np.diff(self.breaks)
+            # error of merging the segments k and k+1 (only pairs of bounded segments)
+            error = (nu[:-2] - nu[1:-1]) * length[:-1] * length[1:] / (length[:-1] + length[1:])
+            k = int(np.argmin(error))
+            nu[k] = (nu[k] * length[k] + nu[k + 1] * length[k + 1]) / (length[k] + length[k + 1])
+            self._breaks[k + 1:self.n - 1] = self._breaks[k + 2:self.n]
+            self._slopes[k + 1:self.n - 1] = self._slopes[k + 2:self.n]
+            self.n -= 1
+
+    def to_dict(self):
+        # format of the FOSVA results ('u' breakpoints, 'v' slopes)
+        return {'u': self.breaks.tolist(), 'v': self.slopes.copy()}
+
+
+class ConcavePWLBatch():
+    """
+    A set of ConcavePWL (one per component) updated all at once.
+    Breakpoints and slopes are padded 2-D arrays (one row per function, n[i] entries in use),
+    the unused breakpoints are +inf such that they always stay at the end of the rows.
+    The result of every update is the same of updating each ConcavePWL on its own.
+    """
+    def __init__(self, n_rows, capacity=64):
+        self.n = np.ones(n_rows, dtype=int)
+        self._breaks = np.full((n_rows, capacity), np.inf)
+        self._breaks[:, 0] = 0.0
+        self._slopes = np.zeros((n_rows, capacity))
+        self._rows = np.arange(n_rows)
+
+    def _reserve(self, size):
+        # it doubles the columns of the arrays until size entries fit in each row
+        capacity = self._breaks.shape[1]
+        if size > capacity:
+            capacity = max(size, 2 * capacity)
+            pad = capacity - self._breaks.shape[1]
+            self._breaks = np.pad(self._breaks, ((0, 0), (0, pad)), constant_values=np.inf)
+            self._slopes = np.pad(self._slopes, ((0, 0), (0, pad)))
+
+    def insert(self, s):
+        """
+        It adds the breakpoint s[i] to the function i (if not already present), as ConcavePWL.insert.
+        :return: the positions of s
+        """
+        width = np.max(self.n) + 1
+        self._reserve(width)
+        # only the columns in use (plus one) are involved
+        breaks = self._breaks[:, :width]
+        slopes = self._slopes[:, :width]
+        # position of s in each row (the padding is +inf)
+        pos = np.sum(breaks < s[:, None], axis=1)
+        new = breaks[self._rows, pos] != s
+        slope = np.where(pos > 0, slopes[self._rows, pos - 1], slopes[self._rows, self.n - 1])
+        # the entries from pos on are shifted right by one in the rows with a new breakpoint
+        shift = new[:, None] & (np.arange(1, width)[None, :] > pos[:, None])
+        np.copyto(breaks[:, 1:], breaks[:, :-1], where=shift)
+        np.copyto(slopes[:, 1:], slopes[:, :-1], where=shift)
+        breaks[self._rows[new], pos[new]] = s[new]
+        slopes[self._rows[new], pos[new]] = slope[new]
+        self.n += new
+        return pos
+
+    def update(self, s, alpha, pi_m, pi_p):
+        """
+        One FOSVA iteration on every function, as ConcavePWL.update with s, pi_m and pi_p arrays.
+        """
+        pos = self.insert(np.asarray(s, dtype=float))
+        slopes = self._slopes[:, :np.max(self.n)]
+        left = np.arange(slopes.shape[1])[None, :] < pos[:, None]
+        # the slopes move towards pi_p on the left of s and towards pi_m from s on (also on the padding, never read)
+        step = (1 - alpha) * slopes
+        step += alpha * np.where(left, np.asarray(pi_p)[:, None], np.asarray(pi_m)[:, None])
+        np.maximum(slopes, step, out=slopes, where=left)
+        np.minimum(slopes, step, out=slopes, where=~left)
+
+    def merge(self, max_breakpoints):
+        """
+        It merges neighbouring segments of the functions with more than max_breakpoints breakpoints,
+        as ConcavePWL.merge.
+        """
+        if max_breakpoints < 2:
+            raise ValueError('At least two breakpoints are required')
+        while np.any(self.n > max_breakpoints):
+            rows = self._rows[self.n > max_breakpoints]
+            breaks = self._breaks[rows]
+            nu = self._slopes[rows]
+            with np.errstate(invalid='ignore'):
+                # the padding gives nan, it is masked below
+                length = np.diff(breaks, axis=1)
+                error = (nu[:, :-2] - nu[:, 1:-1]) * length[:, :-1] * length[:, 1:] / (length[:, :-1] + length[:, 1:])
+            # only pairs of bounded segments can be merged
+            cols = np.arange(error.shape[1])
+            error[cols[None, :] >= (self.n[rows] - 2)[:, None]] = np.inf
+            k = np.argmin(error, axis=1)
+            l_k = length[np.arange(rows.size), k]
+            l_k1 = length[np.arange(rows.size), k + 1]
+            nu_k = nu[np.arange(rows.size), k]
+            nu_k1 = nu[np.arange(rows.size), k + 1]
+            nu[np.arange(rows.size), k] = (nu_k * l_k + nu_k1 * l_k1) / (l_k + l_k1)
+            # the entries after k + 1 are shifted left by one
+            cols = np.arange(breaks.shape[1])
+            source = np.minimum(cols[None, :] + (cols[None, :] > k[:, None]), breaks.shape[1] - 1)
+            breaks = np.take_along_axis(breaks, source, axis=1)
+            nu = np.take_along_axis(nu, source, axis=1)
+            self.n[rows] -= 1
+            breaks[cols[None, :] >= self.n[rows][:, None]] = np.inf
+            self._breaks[rows] = breaks
+            self._slopes[rows] = nu
+
+    def get_state(self):
+        # arrays that describe the functions (the columns in use only)
+        width = np.max(self.n)
+        return {'n': self.n.copy(), 'breaks': self._breaks[:, :width].copy(), 'slopes': self._slopes[:, :width].copy()}
+
+    def set_state(self, n, breaks, slopes):
+        self.n = np.array(n, dtype=int)
+        self._rows = np.arange(self.n.size)
+        self._breaks = np.array(breaks, dtype=float)
+        self._slopes = np.array(slopes, dtype=float)
+
+    def to_list(self):
+        # format of the FOSVA results, one dict per function
+        return [
+            {'u': self._breaks[i, :self.n[i]].tolist(), 'v': self._slopes[i, :self.n[i]].copy()}
+            for i in self._rows
+        ]
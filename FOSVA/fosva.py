@@ -1,45 +1,103 @@
+import os
 import matplotlib.pyplot as plt
 import numpy as np
 from tqdm import tqdm
+from .concave_pwl import ConcavePWL, ConcavePWLBatch
+from utils.piecewise import PiecewiseLinear
 
-def multi_fosva(alpha_fun, len_x, grad, random_point_generator, n_iterations):
+def multi_fosva(alpha_fun, len_x, grad, random_point_generator, n_iterations, max_breakpoints=None, batch_size=1, checkpoint=None, checkpoint_every=100):
     """Multidimensional FOSVA
+    If max_breakpoints is not None, the segments of each component are merged
+    as soon as its breakpoints exceed max_breakpoints.
+    If batch_size > 1, batch_size points are drawn at once and grad receives their list
+    (returning the list of their slopes), such that it can evaluate them concurrently.
+    The updates are then applied one point at a time, in the order of the draws and with the
+    step size of each iteration. Since the slopes of a point do not depend on the current approximation,
+    the result is the same of batch_size = 1.
+    If checkpoint is not None, every (about) checkpoint_every iterations the state of the algorithm
+    (breakpoints, slopes, iteration, step size and state of the numpy random generator) is saved in the
+    npz file checkpoint. If the file already exists, the run resumes from it, with the same result
+    of an uninterrupted run (as long as random_point_generator draws from numpy.random).
+    A checkpoint of a different run (len_x, n_iterations, batch_size or max_breakpoints) raises a ValueError.
     """
-    # Initialize
-    ans = [] 
-    for _ in range(len_x):
-        ans.append({'u': [0], 'v': [0]})
+    # Initialize (one row of breakpoints and slopes per component)
+    pwl = ConcavePWLBatch(len_x)
     alpha = alpha_fun(0)
-    # for each iteration
+    first = 0
+    # parameters of the run, a checkpoint is resumed only by the same run
+    run = {'len_x': len_x, 'n_iterations': n_iterations, 'batch_size': batch_size, 'max_breakpoints': max_breakpoints or 0}
+    if checkpoint and os.path.exists(checkpoint):
+        first, alpha = _load_checkpoint(checkpoint, pwl, run)
+    last_saved = first
+    # for each batch of iterations
     print('Fosva computation')
-    for it in tqdm(range(n_iterations)):
-        # take a random point
-        vec_s = random_point_generator()
-        # evaluate the right and left slope in that point
-        posGrad, negGrad = grad(vec_s)
-        # update the values in the vectors:
-        for i in range(len_x):
-            pi_p = posGrad[i]
-            pi_m = negGrad[i]
-            s = vec_s[i]
-            u = ans[i]['u']
-            nu = ans[i]['v']
-            u_new, nu_new = _run_fosva_iteration(
-                u, nu, s, alpha, pi_m, pi_p
-            )
-            ans[i]['u'] = u_new
-            ans[i]['v'] = nu_new
-        # At each iteration, we can apply declining step size for stability.
-        alpha = alpha_fun(it + 1)
+    for start in tqdm(range(first, n_iterations, batch_size)):
+        # take the random points
+        points = [random_point_generator() for _ in range(min(batch_size, n_iterations - start))]
+        # evaluate the right and left slope in those points
+        if batch_size > 1:
+            slopes = grad(points)
+        else:
+            slopes = [grad(points[0])]
+        for it, vec_s, (posGrad, negGrad) in zip(range(start, n_iterations), points, slopes):
+            # update the values of all the components at once:
+            pwl.update(vec_s, alpha, negGrad, posGrad)
+            if max_breakpoints:
+                pwl.merge(max_breakpoints)
+            # At each iteration, we can apply declining step size for stability.
+            alpha = alpha_fun(it + 1)
+        done = start + len(points)
+        if checkpoint and (done - last_saved >= checkpoint_every or done == n_iterations):
+            _save_checkpoint(checkpoint, pwl, done, alpha, run)
+            last_saved = done
+
+    return pwl.to_list()
+
+
+def _save_checkpoint(path, pwl, iteration, alpha, run):
+    # the file is replaced only once completely written, so a crash never leaves a broken checkpoint
+    _, keys, pos, has_gauss, cached_gaussian = np.random.get_state()
+    tmp = path + '.tmp.npz'
+    np.savez(
+        tmp,
+        iteration=iteration,
+        alpha=alpha,
+        **{'run_' + key: value for key, value in run.items()},
+        rng_keys=keys,
+        rng_pos=pos,
+        rng_has_gauss=has_gauss,
+        rng_cached_gaussian=cached_gaussian,
+        **pwl.get_state()
+    )
+    os.replace(tmp, path)
 
-    return ans
 
+def _load_checkpoint(path, pwl, run):
+    # it restores pwl and the numpy random generator, it returns the next iteration and its step size
+    with np.load(path) as data:
+        for key, value in run.items():
+            if 'run_' + key not in data:
+                raise ValueError(f'The checkpoint {path} does not record {key}, it cannot be resumed')
+            if int(data['run_' + key]) != value:
+                raise ValueError(
+                    f"The checkpoint {path} belongs to another run: {key} is {int(data['run_' + key])} instead of {value}"
+                )
+        n, breaks, slopes = data['n'], data['breaks'], data['slopes']
+        if n.shape != (run['len_x'],) or breaks.shape != slopes.shape or breaks.shape[0] != run['len_x'] \
+                or np.any(n < 1) or np.any(n > breaks.shape[1]) or int(data['iteration']) > run['n_iterations']:
+            raise ValueError(f'The checkpoint {path} is not consistent with {run}')
+        pwl.set_state(n, breaks, slopes)
+        np.random.set_state((
+            'MT19937', data['rng_keys'], int(data['rng_pos']),
+            int(data['rng_has_gauss']), float(data['rng_cached_gaussian'])
+        ))
+        return int(data['iteration']), float(data['alpha'])
 
-def fosva(alpha_fun, grad_p, grad_m, range_low, range_high, n_iterations):
+
+def fosva(alpha_fun, grad_p, grad_m, range_low, range_high, n_iterations, max_breakpoints=None):
     """One dimensional FOSVA
     """
-    u = [0] # breakpoints
-    nu = [0] # slopes
+    pwl = ConcavePWL()
     alpha = alpha_fun(0)
     for i in range(n_iterations - 1):
         # generate a random point
@@ -50,72 +108,49 @@ def fosva(alpha_fun, grad_p, grad_m, range_low, range_high, n_iterations):
         # evaluate the right and left slope in that point
         pi_p = grad_p(s)
         pi_m = grad_m(s)
-        u, nu = _run_fosva_iteration(u, nu, s, alpha, pi_m, pi_p)
+        pwl.update(s, alpha, pi_m, pi_p)
+        if max_breakpoints:
+            pwl.merge(max_breakpoints)
         # At each iteration, we can apply declining step size for stability.
         alpha = alpha_fun(i + 1)
-    return u, nu
+    ans = pwl.to_dict()
+    return ans['u'], ans['v']
 
 
 def _run_fosva_iteration(u, nu, s, alpha, pi_m, pi_p):
-    # duplicate the array u
-    u_old = [ele for ele in u]
-    # add the point s if it is not in the array u
-    if s not in u:
-        u.append(s)
-    # sort the u array
-    u.sort()
-    # update accordingly the vector of slopes with a new component
-    nu = update_nu(nu, u_old, u)
-    # Update the value of the slope:
-    nu_new_p = (1-alpha) * np.array(nu) + alpha * np.ones_like(nu) * pi_p
-    nu_new_m = (1-alpha) * np.array(nu) + alpha * np.ones_like(nu) * pi_m
-    # Update the array of slopes nu in order to have a decreasing vector
-    # start by computing the pos of the new point s in the vector u
-    pos_s = u.index(s)
-    # update all the values to the right of pos_s if smaller nu_new_p[k]
-    for k in range(0, min(pos_s, len(nu)) ):
-        if nu[k] < nu_new_p[k]:
-            nu[k] = nu_new_p[k]
-    # if the new point was not in the last position
-    if pos_s < len(nu):
-        # update all the values to the left of pos_s if greter than nu_new_m[k]
-        for k in range(pos_s, len(nu)):
-            if nu[k] > nu_new_m[k]:
-                nu[k] = nu_new_m[k]
-    return u, nu
+    # one iteration on the breakpoints u and on the slopes nu
+    pwl = ConcavePWL(u, nu, capacity=len(u) + 1)
+    pwl.update(s, alpha, pi_m, pi_p)
+    ans = pwl.to_dict()
+    return ans['u'], ans['v']
 
 
 def update_nu(nu, u_old, u_new):
     """
     It return the vector of slopes updated, i.e. with one new component,
     """
-    # create a new vector of slopes
-    nu_new = np.zeros_like(u_new, dtype=float)
-    pos_u_old = 0
-    # for each position in u_new
-    for i in range(len(u_new)):
-        if len(u_old) <= pos_u_old:
-            # if the position is the last, nu_new must be equal to the value if the previous position
-            nu_new[i] = nu[pos_u_old - 1]
-        else:
-            # if  u_new[i] == u_old[pos_u_old] then the array u has not been modified
-            if u_new[i] == u_old[pos_u_old]:
-                # then, nu_new must be equal to nu
-                nu_new[i] = nu[pos_u_old]
-                # we can consider a new position
-                pos_u_old += 1
-            else:
-                # otherwise, nu_new must be equal to the value if the previous position
-                nu_new[i] = nu[pos_u_old - 1]
-    return nu_new
+    u_old = np.asarray(u_old, dtype=float)
+    nu = np.asarray(nu, dtype=float)
+    # position of each new breakpoint among the old ones
+    pos = np.searchsorted(u_old, u_new)
+    found = (pos < u_old.size) & (u_old[np.minimum(pos, u_old.size - 1)] == u_new)
+    # nu_new is equal to nu on the old breakpoints and to the value of the previous position on the new ones
+    return np.where(found, nu[np.minimum(pos, u_old.size - 1)], nu[pos - 1])
+
+
+def merge_breakpoints(u, nu, max_breakpoints):
+    """
+    It merges neighbouring segments until there are at most max_breakpoints breakpoints (see ConcavePWL.merge).
+    """
+    pwl = ConcavePWL(u, nu)
+    pwl.merge(max_breakpoints)
+    ans = pwl.to_dict()
+    return ans['u'], ans['v']
 
 
 def piecewise_function(x, breaks, slopes):
     """It evaluates the piecewise linear function
     (described by a set of breaks and slopes) in the point x.
+    To evaluate many times the same function, build a PiecewiseLinear once.
     """
-    coeff = [(slopes[0], 0)]
-    for i in range(1, len(slopes)):
-        q = coeff[-1][1] + (slopes[i-1]-slopes[i]) * breaks[i]
-        coeff.append( (slopes[i], q) )
-    return np.piecewise(x, [x >= b for b in breaks], [lambda x=x, m=c[0], q=c[1]: m*x + q for c in coeff])
+    return PiecewiseLinear(breaks, slopes)(x)
@@ -1,6 +1,7 @@
 import json
 import pickle
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from FOSVA import *
 
 def compute_gradient(instance, inventory, prb, demand, eps):
@@ -33,11 +34,239 @@ def compute_gradient(instance, inventory, prb, demand, eps):
     return posGrad, negGrad
 
 
-def run_multifosva_ato(instance, prb, demand, step_derivative, alpha_fun, n_iterations_fosva, save_pkl=None, save_json=None):
-    # create a function to compute the gradient
-    grad = lambda inventory: compute_gradient(
-        instance, inventory, prb, demand, step_derivative
+def compute_gradient_rhs(instance, inventory, prb, demand, eps):
+    """ It computes right and left slopes as compute_gradient, but the model of prb
+    (i.e., AtoRP_approx_comp_v) is built once: each perturbation edits the RHS of its
+    inventory_link constraints and it is re-optimized from the previous basis.
+    """
+    instance.inventory = inventory
+    model = prb.populate(instance, demand, [])
+    model.setParam('OutputFlag', 0)
+    link = prb.inventory_link
+    # nominal value
+    ofNom = _reoptimize(model, link, inventory)
+    # inizialization
+    posGrad = np.zeros(instance.n_components)
+    negGrad = np.zeros(instance.n_components)
+
+    for i in range(instance.n_components):
+        # inventory modification
+        inventory[i] += eps
+        posGrad[i] = (_reoptimize(model, link, inventory) - ofNom)/eps
+        # inventory modification
+        inventory[i] -= 2*eps # one eps to nominal, one eps for left grad
+        negGrad[i] = (ofNom - _reoptimize(model, link, inventory))/eps # notice the sign
+        # back to nominal
+        inventory[i] += eps
+    model.dispose()
+    return posGrad, negGrad
+
+
+def _reoptimize(model, link, inventory):
+    # objective function with the given inventory (-1 if not optimal, as in AtoG_multi)
+    # gurobipy is imported only when required, such that FOSVA can be imported without it
+    import gurobipy as grb
+    link.RHS = inventory
+    model.optimize()
+    if model.status == grb.GRB.Status.OPTIMAL:
+        return model.ObjVal
+    return -1
+
+
+def perturbed_inventories(inventory, eps):
+    """ It returns the inventories solved by compute_gradient, in the same order and with the same
+    floating point values (the serial path moves the inventory in place, component by component).
+    The inventory is left as compute_gradient leaves it.
+    """
+    points = [inventory.copy()]
+    for i in range(len(inventory)):
+        inventory[i] += eps
+        points.append(inventory.copy())
+        inventory[i] -= 2*eps
+        points.append(inventory.copy())
+        inventory[i] += eps
+    return points
+
+
+# state of a worker of ParallelGradient: its own copy of the instance, of the solver and of the demand
+_worker = {}
+
+
+def _init_worker(instance, prb_class, setting, demand):
+    _worker['instance'] = instance
+    _worker['prb'] = prb_class(**setting)
+    _worker['demand'] = demand
+
+
+def _solve_worker(inventory):
+    _worker['instance'].inventory = inventory
+    of, _, _, _ = _worker['prb'].solve(_worker['instance'], _worker['demand'], [])
+    return of
+
+
+class ParallelGradient():
+    """ Finite differences of compute_gradient on a pool of n_workers processes.
+    Each worker holds its own copy of the instance and of the solver (built from the class and the setting of prb),
+    so the perturbed inventories are solved without changing any shared state.
+    The slopes are bit-identical to the ones of compute_gradient.
+    """
+    def __init__(self, instance, prb, demand, eps, n_workers):
+        self.instance = instance
+        self.eps = eps
+        self.pool = ProcessPoolExecutor(
+            max_workers=n_workers,
+            initializer=_init_worker,
+            initargs=(instance, type(prb), prb.setting, demand)
+        )
+
+    def __call__(self, inventory):
+        self.instance.inventory = inventory
+        # nominal value first, then right and left perturbation of each component
+        ofs = list(self.pool.map(_solve_worker, perturbed_inventories(inventory, self.eps)))
+        ofNom = ofs[0]
+        posGrad = np.zeros(self.instance.n_components)
+        negGrad = np.zeros(self.instance.n_components)
+        for i in range(self.instance.n_components):
+            posGrad[i] = (ofs[2*i + 1] - ofNom)/self.eps
+            negGrad[i] = (ofNom - ofs[2*i + 2])/self.eps # notice the sign
+        return posGrad, negGrad
+
+    def close(self):
+        self.pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _init_batch_worker(instance, prb_class, setting, demand, gradient, eps):
+    _init_worker(instance, prb_class, setting, demand)
+    _worker['gradient'] = gradient
+    _worker['eps'] = eps
+
+
+def _gradient_worker(inventory):
+    posGrad, negGrad = _worker['gradient'](
+        _worker['instance'], inventory, _worker['prb'], _worker['demand'], _worker['eps']
     )
+    # the inventory is sent back as the gradient leaves it (moved in place by the finite differences)
+    return posGrad, negGrad, inventory
+
+
+class BatchGradient():
+    """ Slopes of a batch of points (mini-batch multi_fosva) on a pool of n_workers processes,
+    one point per worker at a time. Each point is processed by gradient (e.g., compute_gradient)
+    in a worker with its own copy of the instance and of the solver, as in ParallelGradient.
+    The points are overwritten with the values left by gradient, so the result is bit-identical
+    to the serial path.
+    """
+    def __init__(self, instance, prb, demand, eps, n_workers, gradient=None):
+        self.instance = instance
+        self.pool = ProcessPoolExecutor(
+            max_workers=n_workers,
+            initializer=_init_batch_worker,
+            initargs=(instance, type(prb), prb.setting, demand, gradient or compute_gradient, eps)
+        )
+
+    def __call__(self, points):
+        slopes = []
+        for point, (posGrad, negGrad, inventory) in zip(points, self.pool.map(_gradient_worker, points)):
+            point[:] = inventory
+            slopes.append((posGrad, negGrad))
+        # as in the serial path, the instance keeps the last point
+        self.instance.inventory = points[-1]
+        return slopes
+
+    def close(self):
+        self.pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def compute_gradient_dual(instance, inventory, prb, demand, eps):
+    """ It computes right and left slopes from the duals of the inventory_link constraints of prb,
+    i.e., AtoRP_approx_comp_v, with one single solve.
+    The duals hold in the RHS ranges [SARHSLow, SARHSUp]. When the inventory of a component is
+    on the border of its range (a degenerate point), the missing slope is the dual of a re-solve
+    with the inventory moved by eps, starting from the previous basis.
+    The ends of the ranges are compared with the RHS up to the feasibility tolerance of the solver.
+    """
+    instance.inventory = inventory
+    model = prb.populate(instance, demand, [])
+    model.setParam('OutputFlag', 0)
+    model.optimize()
+    link = prb.inventory_link
+    _check_optimal(model, inventory)
+    posGrad = np.array(link.Pi)
+    negGrad = np.array(link.Pi)
+    low = np.array(link.SARHSLow)
+    up = np.array(link.SARHSUp)
+    rhs = np.array(link.RHS)
+    # ends of the ranges within the rounding errors of the RHS
+    tol = model.Params.FeasibilityTol * np.maximum(1, np.abs(rhs))
+    for i in range(instance.n_components):
+        if up[i] <= rhs[i] + tol[i]:
+            # the basis is optimal on the left only
+            posGrad[i] = _resolve_dual(model, link, rhs, i, eps)
+        if low[i] >= rhs[i] - tol[i]:
+            # the basis is optimal on the right only
+            negGrad[i] = _resolve_dual(model, link, rhs, i, -eps)
+    model.dispose()
+    return posGrad, negGrad
+
+
+def _check_optimal(model, inventory):
+    # the duals are available only if the model is solved to optimality
+    import gurobipy as grb
+    if model.status != grb.GRB.Status.OPTIMAL:
+        raise ValueError(f'No optimal solution (status {model.status}) for the inventory {inventory}, the duals are not available')
+
+
+def _resolve_dual(model, link, rhs, i, delta):
+    # dual of the i-th inventory_link constraint with the inventory of component i moved by delta
+    tmp = rhs.copy()
+    tmp[i] += delta
+    link.RHS = tmp
+    model.optimize()
+    link.RHS = rhs
+    _check_optimal(model, tmp)
+    return link.Pi[i]
+
+
+def run_multifosva_ato(instance, prb, demand, step_derivative, alpha_fun, n_iterations_fosva, save_pkl=None, save_json=None, gradient='finite_differences', n_workers=1, max_breakpoints=None, batch_size=1, checkpoint=None, checkpoint_every=100):
+    # create a function to compute the gradient, either by finite differences (on n_workers processes),
+    # by finite differences on one single model ('rhs') or by the duals of a single solve ('dual').
+    # With batch_size > 1, the batch_size points of each mini-batch are split among the n_workers processes
+    gradient_fun = {
+        'dual': compute_gradient_dual,
+        'rhs': compute_gradient_rhs
+    }.get(gradient, compute_gradient)
+    if batch_size > 1 and n_workers > 1:
+        grad = BatchGradient(instance, prb, demand, step_derivative, n_workers, gradient_fun)
+    elif batch_size > 1:
+        grad = lambda points: [
+            gradient_fun(instance, inventory, prb, demand, step_derivative) for inventory in points
+        ]
+    elif gradient == 'dual':
+        grad = lambda inventory: compute_gradient_dual(
+            instance, inventory, prb, demand, step_derivative
+        )
+    elif gradient == 'rhs':
+        grad = lambda inventory: compute_gradient_rhs(
+            instance, inventory, prb, demand, step_derivative
+        )
+    elif n_workers > 1:
+        grad = ParallelGradient(instance, prb, demand, step_derivative, n_workers)
+    else:
+        grad = lambda inventory: compute_gradient(
+            instance, inventory, prb, demand, step_derivative
+        )
     # create a function generate a random inventory
     def random_point_generator():
         mean_demand_component = np.mean(demand, axis=1) @ instance.gozinto
@@ -45,18 +274,27 @@ def run_multifosva_ato(instance, prb, demand, step_derivative, alpha_fun, n_iter
                 0.05, 4, size=mean_demand_component.shape
             ) * mean_demand_component
     # run the multi_fosva function which computes FOSVA for multi dimensional functions
-    ans = multi_fosva(
-        alpha_fun=alpha_fun,
-        grad=grad,
-        random_point_generator=random_point_generator,
-        len_x=instance.n_components,
-        # len_x=instance.n_items,
-        n_iterations=n_iterations_fosva
-    )
+    # (the pool of processes of the gradient, if any, is shut down even if it fails)
+    try:
+        ans = multi_fosva(
+            alpha_fun=alpha_fun,
+            grad=grad,
+            random_point_generator=random_point_generator,
+            len_x=instance.n_components,
+            # len_x=instance.n_items,
+            n_iterations=n_iterations_fosva,
+            max_breakpoints=max_breakpoints,
+            batch_size=batch_size,
+            checkpoint=checkpoint,
+            checkpoint_every=checkpoint_every
+        )
+    finally:
+        if isinstance(grad, (ParallelGradient, BatchGradient)):
+            grad.close()
     # if needed dave a pickel file
     if save_pkl:
-        filehandler = open(save_pkl,"wb")
-        pickle.dump(ans, filehandler)
+        with open(save_pkl, "wb") as filehandler:
+            pickle.dump(ans, filehandler)
     # if needed dave a json file
     if save_json:
         # to print the json value we define this class to print numpy array
@@ -65,7 +303,7 @@ def run_multifosva_ato(instance, prb, demand, step_derivative, alpha_fun, n_iter
                 if isinstance(obj, np.ndarray):
                     return obj.tolist()
                 return json.JSONEncoder.default(self, obj)
-        with open('./results/ans.json', 'w') as outfile:
+        with open(save_json, 'w') as outfile:
             json.dump(
                 ans, outfile,
                 cls=NumpyEncoder
@@ -12,3 +12,7 @@ class AtoAgent():
     def get_action(self, obs):
         # The get action function generate the production decision w.r.t. the observed state of the system
         pass
+
+    def close(self):
+        # It releases the resources of the solver (e.g., its pools of processes) at the end of the simulation
+        self.prb.close()
@@ -1,16 +1,18 @@
 from .atoAgent import AtoAgent
-from solver.solverGurobi import AtoRPMultiStage #Only this solver is allowed due to the seasonalization.
+from solver.atoTree import AtoTree #Only the AtoRPMultiStage solvers (solverGurobi or solverLP) are allowed due to the seasonalization.
 import numpy as np
 
 
 class MultiStageAgent(AtoAgent):
-    def __init__(self, env, solver:AtoRPMultiStage , observedDemand):
+    def __init__(self, env, solver:AtoTree , observedDemand, warm_start = False):
         super(MultiStageAgent, self).__init__(env, solver, observedDemand)
         self.env = env
         self.seas = self.env.seas
         self.prb = solver
         self.prb.seasonalize(self.seas)
         self.demand = observedDemand
+        #If the warm_start flag is on, the basis of each period initializes the model of the next one
+        self.basis = {} if warm_start else None
 
     #Update the historical demand according to new observations
     #The available demand is then employed to enhance the aprroximation of the future stages
@@ -20,10 +22,15 @@ class MultiStageAgent(AtoAgent):
 
     def get_action(self, obs):
         # The decision is made by solving the ATO problem.
+        #the basis is passed only if the warm start is on, since not all the solvers accept it
+        kwargs = {} if self.basis is None else {'warm_start': self.basis}
         _, solX, solY , _ = self.prb.solve(
             self.env.instance,
             self.demand,
-            obs['demand'])
+            obs['demand'],
+            **kwargs)
+        if self.basis is not None:
+            self.basis = self.prb.basis
         #The multistage solver has an internal clock that must be updated. In this way
         # it is possible to take into account the seasonality within the estimaion of the future demand for 
         # a horizon longer than two stages.
@@ -1,5 +1,3 @@
-import time
-import gurobipy as grb
 from solver.Ato import Ato
 from .atoAgent import AtoAgent
 
@@ -11,34 +9,16 @@ class PerfectInfoAgent(AtoAgent):
         self.demand = futureDemand #This class need all the future demand, such that decisions are made with perfect information
 
         #The agent itself solves a deterministic model to decide the sold and assembled quantity all over the horizon
-        sol, model, I, Y, L = self.prb.populate(
+        #(AtoPI of solverGurobi or of solverLP)
+        _, sol, Y, _ = self.prb.solve(
             self.env.instance,
             futureDemand
         )
-        self.__solve_opt_prb(model)    
-        
         #Waring in case of no solution
-        if model.status == grb.GRB.Status.OPTIMAL:    
-            self.sol = sol.X
-            self.Y = Y.X
-        else:
+        if len(sol) == 0:
             raise ValueError('No optimal solution found')
-
-    def __solve_opt_prb(self, model, time_limit=None, gap=None, verbose=False):
-        if gap:
-            model.setParam('MIPgap', gap)
-        if time_limit:
-            model.setParam(grb.GRB.Param.TimeLimit, time_limit)
-        if verbose:
-            model.setParam('OutputFlag', 1)
-            print ('Solving a model with: '+str(model.NumConstrs)+' constraints')
-            print ('    and: ' +str(model.NumVars)+ ' variables')
-        else:
-            model.setParam('OutputFlag', 0)
-        start = time.time()
-        model.optimize()
-        end = time.time()
-        return end-start
+        self.sol = sol
+        self.Y = Y
 
     def get_action(self, obs):
         return self.sol[:,self.env.current_step], self.Y[:,self.env.current_step]
\ No newline at end of file
@@ -4,12 +4,14 @@ import numpy as np
 
 
 class TwoStageAgent(AtoAgent):
-    def __init__(self, env, solver:Ato , observedDemand, full = False):
+    def __init__(self, env, solver:Ato , observedDemand, full = False, warm_start = False):
         super(TwoStageAgent, self).__init__(env, solver, observedDemand)
         self.env = env
         self.prb = solver
         self.demand = observedDemand
         self.full = full
+        #If the warm_start flag is on, the basis of each period initializes the model of the next one
+        self.basis = {} if warm_start else None
 
     
     #Update the historical demand according to new observations
@@ -24,18 +26,24 @@ class TwoStageAgent(AtoAgent):
         # data about the demand is trimmed such that only the of a particular season are taken into account when 
         # the problem is solved.
         # If the full flag is on, the model does not take into account the seasonality, using the entire demand for each step
+        #the basis is passed only if the warm start is on, since not all the solvers accept it
+        kwargs = {} if self.basis is None else {'warm_start': self.basis}
         if self.full:
             _, solX, solY, _ = self.prb.solve(
                 self.env.instance,
                 self.demand,
-                obs['demand']
+                obs['demand'],
+                **kwargs
             )
         else:
             _, solX, solY, _ = self.prb.solve(
                 self.env.instance,
                 self.demand[:,np.arange(obs['seasonalFactor'] ,len( self.demand[0,:]) ,self.env.seas)],
-                obs['demand']
+                obs['demand'],
+                **kwargs
             )
+        if self.basis is not None:
+            self.basis = self.prb.basis
         self.__updateDemand(obs['demand'])
         return solX, solY
 
@@ -0,0 +1,49 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# Time required to populate the two-stage models w.r.t. the number of scenarios.
+# Run it from the root of the repository: python -m benchmarks.build_time
+import time
+import json
+import numpy as np
+from instances import *
+from sampler import *
+from solver.solverGurobi import *
+
+n_scenarios_list = [10, 100, 1000, 5000]
+
+fp = open("./etc/instance_Params.json", 'r')
+sim_setting = json.load(fp)
+fp.close()
+fp = open("./etc/ato_Params.json", 'r')
+ato_setting = json.load(fp)
+fp.close()
+fp = open("./etc/sampler_Params.json", 'r')
+smpl_setting = json.load(fp)
+fp.close()
+
+sam = BiGaussianSampler(smpl_setting)
+instance = InstanceRandom(sim_setting, sam)
+#flat value function approximation with two breakpoints per component
+fosva_res = [{'u': np.array([0.0, 100.0]), 'v': np.array([1.0, 0.0])} for _ in range(instance.n_components)]
+
+problems = {
+    'AtoRP': (AtoRP(), False),
+    'AtoRP_multi': (AtoRP_multi(), True),
+    'AtoCVaR': (AtoCVaR(**ato_setting), False),
+    'AtoCVaRProfit': (AtoCVaRProfit(**ato_setting), False),
+    'AtoRP_approx_comp': (AtoRP_approx_comp(fosva_res=fosva_res), True),
+    'AtoRP_approx_comp_v': (AtoRP_approx_comp_v(), True)
+}
+
+print(f"{'model':<22}{'n_scenarios':>12}{'vars':>10}{'constrs':>10}{'build [s]':>12}")
+for n_scenarios in n_scenarios_list:
+    demand = sam.sample(n_scenarios)
+    for name, (prb, rolling) in problems.items():
+        start = time.time()
+        if rolling:
+            model = prb.populate(instance, demand, demand[:, 0])
+        else:
+            model = prb.populate(instance, demand)
+        end = time.time()
+        print(f"{name:<22}{n_scenarios:>12}{model.NumVars:>10}{model.NumConstrs:>10}{end - start:>12.3f}")
+        model.dispose()
@@ -0,0 +1,39 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# Size and time required to populate AtoRP_approx_comp w.r.t. the number of breakpoints of the value function.
+# Run it from the root of the repository: python -m benchmarks.fosva_build_time
+import time
+import json
+import numpy as np
+from instances import *
+from sampler import *
+from solver.solverGurobi import AtoRP_approx_comp
+
+n_scenarios = 100
+n_breakpoints_list = [2, 10, 50, 100]
+
+fp = open("./etc/instance_Params.json", 'r')
+sim_setting = json.load(fp)
+fp.close()
+fp = open("./etc/sampler_Params.json", 'r')
+smpl_setting = json.load(fp)
+fp.close()
+
+sam = BiGaussianSampler(smpl_setting)
+instance = InstanceRandom(sim_setting, sam)
+demand = sam.sample(n_scenarios)
+mean_demand = np.mean(demand, axis=1) @ instance.gozinto
+
+print(f"{'n_breakpoints':<16}{'vars':>10}{'constrs':>10}{'nonzeros':>12}{'build [s]':>12}")
+for n_breakpoints in n_breakpoints_list:
+    #concave value function with equally spaced breakpoints up to four times the mean demand
+    fosva_res = [
+        {'u': np.linspace(0, 4 * mean_demand[i], n_breakpoints), 'v': np.linspace(instance.costs[i], 0, n_breakpoints)}
+        for i in range(instance.n_components)
+    ]
+    prb = AtoRP_approx_comp(fosva_res=fosva_res)
+    start = time.time()
+    model = prb.populate(instance, demand, demand[:, 0])
+    end = time.time()
+    print(f"{n_breakpoints:<16}{model.NumVars:>10}{model.NumConstrs:>10}{model.NumNZs:>12}{end - start:>12.3f}")
+    model.dispose()
@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# Time required by the FOSVA slopes w.r.t. the inventory: finite differences (serial, parallel and on one single model)
+# vs duals of a single solve, and the mini-batch mode (all the points at once on a pool of processes).
+# Run it from the root of the repository: python -m benchmarks.fosva_gradient
+import time
+import json
+import numpy as np
+from instances import *
+from sampler import *
+from solver.solverGurobi import AtoRP_approx_comp_v
+from FOSVA import compute_gradient, compute_gradient_rhs, compute_gradient_dual, ParallelGradient, BatchGradient
+
+ye = 3
+n_points = 5
+step_derivative = 1
+n_workers = 4
+
+fp = open("./etc/instance_Params.json", 'r')
+sim_setting = json.load(fp)
+fp.close()
+fp = open("./etc/sampler_Params.json", 'r')
+smpl_setting = json.load(fp)
+fp.close()
+
+sam = MultiStageSampler(smpl_setting, BiGaussianSampler(smpl_setting))
+instance = InstanceRandom(sim_setting, sam)
+demand_known = sam.sample(ye*12)
+mean_demand = (np.mean(demand_known, axis=1) @ instance.gozinto).copy()
+prb = AtoRP_approx_comp_v()
+parallel = ParallelGradient(instance, prb, demand_known, step_derivative, n_workers)
+
+gradients = {
+    'finite_differences': compute_gradient,
+    'rhs': compute_gradient_rhs,
+    'parallel': lambda instance, inventory, prb, demand, eps: parallel(inventory),
+    'dual': compute_gradient_dual
+}
+
+print(f"{'gradient':<20}{'time [s]':>12}{'max |pos - pos_fd|':>22}{'max |neg - neg_fd|':>22}")
+np.random.seed(1)
+points = [np.random.uniform(0.05, 4, size=mean_demand.shape) * mean_demand for _ in range(n_points)]
+results = {}
+for name, grad in gradients.items():
+    start = time.time()
+    results[name] = [grad(instance, point.copy(), prb, demand_known, step_derivative) for point in points]
+    end = time.time()
+    diff_pos = max(np.max(np.abs(r[0] - fd[0])) for r, fd in zip(results[name], results['finite_differences']))
+    diff_neg = max(np.max(np.abs(r[1] - fd[1])) for r, fd in zip(results[name], results['finite_differences']))
+    print(f"{name:<20}{(end - start) / n_points:>12.3f}{diff_pos:>22.4f}{diff_neg:>22.4f}")
+parallel.close()
+
+#mini-batch of n_points points, each one on a worker by compute_gradient_rhs
+batch = BatchGradient(instance, prb, demand_known, step_derivative, n_workers, compute_gradient_rhs)
+start = time.time()
+results['batch_rhs'] = batch([point.copy() for point in points])
+end = time.time()
+diff_pos = max(np.max(np.abs(r[0] - fd[0])) for r, fd in zip(results['batch_rhs'], results['finite_differences']))
+diff_neg = max(np.max(np.abs(r[1] - fd[1])) for r, fd in zip(results['batch_rhs'], results['finite_differences']))
+print(f"{'batch_rhs':<20}{(end - start) / n_points:>12.3f}{diff_pos:>22.4f}{diff_neg:>22.4f}")
+batch.close()
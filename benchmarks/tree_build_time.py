@@ -0,0 +1,55 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# Time required to populate the multi-stage model w.r.t. the number of nodes of the scenario tree.
+# Run it from the root of the repository: python -m benchmarks.tree_build_time
+import time
+import json
+import numpy as np
+from instances import *
+from sampler import *
+from scenarioTree import ScenarioTree
+from solver.solverGurobi import AtoRPMultiStage
+
+branching_factors_list = [[10, 10], [10, 10, 10], [100, 100]]
+
+
+class SampledReducer():
+    """
+    Children of a node sampled from the sampler with uniform probabilities
+    (the scenario reduction is not part of the benchmark)
+    """
+    def __init__(self, sampler):
+        self.sampler = sampler
+
+    def reduce(self, n):
+        return self.sampler.sample(n), np.ones(n) / n
+
+
+fp = open("./etc/instance_Params.json", 'r')
+sim_setting = json.load(fp)
+fp.close()
+fp = open("./etc/sampler_Params.json", 'r')
+smpl_setting = json.load(fp)
+fp.close()
+
+sam = BiGaussianSampler(smpl_setting)
+instance = InstanceRandom(sim_setting, sam)
+present_demand = sam.sample(1)[:, 0]
+
+print(f"{'branching factors':<20}{'nodes':>10}{'vars':>10}{'constrs':>10}{'build [s]':>12}")
+for branching_factors in branching_factors_list:
+    scenario_tree = ScenarioTree(
+        name='benchmark',
+        branching_factors=branching_factors,
+        dim_observations=instance.n_items,
+        initial_value=present_demand,
+        stoch_model=[SampledReducer(sam)] * len(branching_factors)
+    )
+    prb = AtoRPMultiStage(branching_factors=branching_factors)
+    #the tree is built once, only the model building is timed
+    prb.build_tree = lambda instance, scenarios, present_demand: scenario_tree
+    start = time.time()
+    model = prb.populate(instance, None, present_demand)
+    end = time.time()
+    print(f"{str(branching_factors):<20}{scenario_tree.n_nodes:>10}{model.NumVars:>10}{model.NumConstrs:>10}{end - start:>12.3f}")
+    model.dispose()
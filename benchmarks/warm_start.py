@@ -0,0 +1,53 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# Simplex iterations of the rolling-horizon policies with and without the warm start of the LP basis.
+# Run it from the root of the repository: python -m benchmarks.warm_start
+import time
+import json
+import numpy as np
+from instances import *
+from sampler import *
+from solver.solverGurobi import *
+from envs import *
+from agents import *
+
+horizon = 24
+ye = 3
+
+fp = open("./etc/instance_Params.json", 'r')
+sim_setting = json.load(fp)
+fp.close()
+fp = open("./etc/sampler_Params.json", 'r')
+smpl_setting = json.load(fp)
+fp.close()
+
+sam = MultiStageSampler(smpl_setting, BiGaussianSampler(smpl_setting))
+instance = InstanceRandom(sim_setting, sam)
+demand_known = sam.sample(ye*12)
+demand_test = sam.sample(horizon)
+mean_demand = (np.mean(demand_known, axis=1) @ instance.gozinto).copy()
+
+policies = {
+    'TS': lambda env, warm: TwoStageAgent(env, AtoRP_multi(), demand_known, warm_start=warm),
+    'TS_noSeas': lambda env, warm: TwoStageAgent(env, AtoRP_multi(), demand_known, full=True, warm_start=warm),
+    'MS3': lambda env, warm: MultiStageAgent(env, AtoRPMultiStage(branching_factors=[ye, ye]), demand_known, warm_start=warm)
+}
+
+print(f"{'policy':<12}{'warm start':>12}{'iterations':>12}{'time [s]':>12}{'cum. profit':>16}")
+for k, make_agent in policies.items():
+    for warm in [False, True]:
+        instance.inventory = mean_demand.copy()
+        env = SimplePlant(instance, demand_test, seasonality=12)
+        obs = env.reset()
+        stoch_agent = make_agent(env, warm)
+        done = False
+        iterations = 0
+        profit = 0
+        start = time.time()
+        while not done:
+            action, sold = stoch_agent.get_action(obs)
+            iterations += stoch_agent.prb.iter_count
+            obs, reward, done, info = env.step(action, sold)
+            profit += reward
+        end = time.time()
+        print(f"{k:<12}{str(warm):>12}{iterations:>12.0f}{end - start:>12.2f}{profit:>16.2f}")
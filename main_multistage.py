@@ -17,6 +17,7 @@ from agents import *
 from FOSVA import *
 #Scenario Reducer
 from scenarioReducer import *
+from solver.atoTree import ScenarioTreeStore
 #utils
 from utils.utils import *
 
@@ -145,6 +146,11 @@ for tight in tightness:
                 # horizon demand
                 demand_test.append(sam.sample(horizon))
 
+            #the multi-stage policies share their scenario trees: the ones of the configurations
+            #with the same first stages (e.g., MS3, MS3_3 and MS3_4) are built once, by the longest one.
+            #The store belongs to this instance: it keeps (at most) the two trees of each period of each rep
+            tree_store = ScenarioTreeStore([[ye, 1, 1, 1], [ye, ye, 1, 1]], max_trees=2 * reps * horizon)
+
             for k in methods:
                 #Inner initialization of the performance metrics per methodology
                 results[k] = dict.fromkeys(['cumProfit','inventory','production','lostSales','profits','time'])
@@ -190,7 +196,7 @@ for tight in tightness:
                             ato_setting["branching_factors"] = [ye]
                         else:
                             raise ValueError('Method not available')
-                        stoch_agent = MultiStageAgent(env, AtoRPMultiStage(**ato_setting), demand_known)
+                        stoch_agent = MultiStageAgent(env, AtoRPMultiStage(**ato_setting, tree_store=tree_store), demand_known)
                     elif k == 'PI':
                         stoch_agent = PerfectInfoAgent(env, AtoPI(**ato_setting), demand)
                     else:
@@ -225,6 +231,8 @@ for tight in tightness:
                         production_costs.append(info['production_costs']) 
                         total_inventory.append(info['total_inventory']) 
                         cumulative_profit.append(sum(profit))
+                    #the solver of the agent releases its resources (e.g., pools of processes)
+                    stoch_agent.close()
                     ##### write the result of the entire rep
                     results[k]['profits'].append(profit)
                     results[k]['time'].append(times)
@@ -233,6 +241,8 @@ for tight in tightness:
                     results[k]['inventory'][i,1:] = total_inventory
                     results[k]['production'][i,:] = production_costs
                     results[k]['lostSales'][i,:] = lost_sales
+            #the trees of this instance are not employed anymore
+            tree_store.clear()
 
             ##############
             ###PLOTS 
@@ -1,7 +1,17 @@
 from .fast_forward_W2 import Fast_forward_W2 
+from .backward_W2 import Backward_W2
+from .simultaneous_backward_W2 import SimultaneousBackward_W2
+from .kmedoids_W2 import KMedoids_W2
 from .scenario_reducer import Scenario_reducer
+from .distances import distance_matrix, extend_distance_matrix, nearest
 
 __all__ = [
     "Fast_forward_W2",
-    "Scenario_reducer"
+    "Backward_W2",
+    "SimultaneousBackward_W2",
+    "KMedoids_W2",
+    "Scenario_reducer",
+    "distance_matrix",
+    "extend_distance_matrix",
+    "nearest"
 ]
\ No newline at end of file
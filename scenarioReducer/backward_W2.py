@@ -0,0 +1,55 @@
+from .scenario_reducer import Scenario_reducer
+import numpy as np
+
+class Backward_W2(Scenario_reducer):
+    '''
+    This class implements a scenario reducer that follows
+    a Backward technique with a 2-norm metric.
+
+    At each step, it removes the scenario l with the smallest p_l * min_j c_lj,
+    where c_lj is the distance from the closest scenario j still in the set,
+    and it moves p_l to j. Only the scenarios whose closest one has been removed
+    are updated at each step, so it is preferred for n>=N/4 (i.e., few removals),
+    where n is the new reduced cardinality and N is the original one.
+
+    We assume a discrete uniform initial distribution on the scenarios.
+    '''
+    def __init__(self, initialSet, dtype=np.float64, block_memory=2**27, dist_mtrx=None):
+        self.initialSet = initialSet
+        self.N = initialSet.shape[1]
+        self.initProbs = (1/self.N)*np.ones(self.N) #room for generalization
+        self.dtype = dtype
+        self.block_memory = block_memory
+        self.dist_mtrx = dist_mtrx #precomputed distance matrix (optional)
+
+    def reduce(self, n_scenarios: int = 1):
+        """
+        reduces the initial set of scenarios
+        """
+        #### computation of the distance matrix
+        dist_mtrx = self.get_distances()
+        dist_mtrx_original = dist_mtrx.copy() #copy of the distance matrix
+        #a scenario is never the closest to itself
+        np.fill_diagonal(dist_mtrx, np.inf)
+        probs = self.initProbs.copy()
+        #closest scenario (and its distance) of each scenario
+        closest = np.argmin(dist_mtrx, axis=1)
+        dist_closest = dist_mtrx[np.arange(self.N), closest]
+        removed = np.zeros(self.N, dtype=bool)
+        for it in range(self.N - n_scenarios):
+            #removal of the scenario with the smallest weighted distance
+            zeta = np.where(removed, np.inf, probs * dist_closest)
+            l = np.argmin(zeta)
+            removed[l] = True
+            probs[closest[l]] += probs[l]
+            probs[l] = 0
+            #the removed scenario cannot be the closest anymore
+            dist_mtrx[:, l] = np.inf
+            to_update = np.flatnonzero(~removed & (closest == l))
+            closest[to_update] = np.argmin(dist_mtrx[to_update], axis=1)
+            dist_closest[to_update] = dist_mtrx[to_update, closest[to_update]]
+        indxR = np.flatnonzero(~removed) #indeces of the reduced set
+        ##Probabilities redistribution
+        probs_reduced = self.redistribute(dist_mtrx_original, indxR)
+        #returns the reduced set and the respective probabilities
+        return self.initialSet[:,indxR],probs_reduced
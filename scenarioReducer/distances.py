@@ -0,0 +1,74 @@
+import numpy as np
+
+
+def distance_matrix(points, dtype=np.float64, block_memory=2**27):
+    '''
+    It returns the N x N matrix of the 2-norm distances between the N columns of points (d x N).
+    It relies on the Gram matrix identity |x - y|^2 = |x|^2 + |y|^2 - 2 x.y, hence on BLAS,
+    and it is computed by blocks of rows of at most block_memory bytes, written in place in the result.
+    The points are centered first, which reduces the cancellation errors of the identity.
+    With dtype=np.float32 both the time and the memory are about halved.
+    '''
+    X = np.asarray(points, dtype=dtype).T
+    X = X - np.mean(X, axis=0)
+    sq_norms = np.einsum('ij,ij->i', X, X)
+    N = X.shape[0]
+    dist = np.empty((N, N), dtype=dtype)
+    n_rows = max(1, int(block_memory // (N * dist.itemsize)))
+    for start in range(0, N, n_rows):
+        block = dist[start:start + n_rows]
+        np.matmul(X[start:start + n_rows], X.T, out=block)
+        block *= -2
+        block += sq_norms[start:start + n_rows, None]
+        block += sq_norms[None, :]
+        # negative values are round-off errors of (almost) equal points
+        np.maximum(block, 0, out=block)
+        np.sqrt(block, out=block)
+    np.fill_diagonal(dist, 0)
+    return dist
+
+
+def extend_distance_matrix(dist, points, dtype=np.float64):
+    '''
+    Given the distance matrix dist (n x n) of the first n columns of points (d x N), it returns the N x N matrix
+    of the distances between all the columns: the old block is copied and only the rows (and the columns)
+    of the N - n new points are computed, from the differences, hence in O(d N (N - n)).
+    '''
+    n = dist.shape[0]
+    X = np.asarray(points, dtype=dtype)
+    N = X.shape[1]
+    res = np.empty((N, N), dtype=dtype)
+    res[:n, :n] = dist
+    for k in range(n, N):
+        diff = X - X[:, k:k + 1]
+        res[k, :] = np.sqrt(np.einsum('ij,ij->j', diff, diff))
+        res[:k, k] = res[k, :k]
+    return res
+
+
+def nearest(points, centers, chunk_size=4096, dtype=np.float64):
+    '''
+    It returns, for each of the N columns of points (d x N), the index of the closest column of centers (d x n)
+    and the squared 2-norm distance from it. The points are processed in chunks of chunk_size columns,
+    so only a chunk_size x n block of distances is in memory at a time.
+    '''
+    C = np.asarray(centers, dtype=dtype).T
+    #the distances do not change if everything is moved by the mean of the centers,
+    #which reduces the cancellation errors of the Gram matrix identity
+    shift = np.mean(C, axis=0)
+    C = C - shift
+    sq_centers = np.einsum('ij,ij->i', C, C)
+    N = points.shape[1]
+    indx = np.empty(N, dtype=int)
+    sq_dist = np.empty(N, dtype=dtype)
+    for start in range(0, N, chunk_size):
+        X = np.asarray(points[:, start:start + chunk_size], dtype=dtype).T - shift
+        block = X @ C.T
+        block *= -2
+        block += sq_centers[None, :]
+        indx[start:start + X.shape[0]] = np.argmin(block, axis=1)
+        #|x|^2 is added to the minimum only, negative values are round-off errors
+        sq_dist[start:start + X.shape[0]] = np.maximum(
+            block[np.arange(X.shape[0]), indx[start:start + X.shape[0]]] + np.einsum('ij,ij->i', X, X), 0
+        )
+    return indx, sq_dist
@@ -10,11 +10,33 @@ class Fast_forward_W2(Scenario_reducer):
     new reduced cardinality and N is the original one.
 
     We assume a discrete uniform initial distribution on the scenarios.
+
+    The distance matrix is computed by blocks of rows (of at most block_memory bytes)
+    through BLAS, in float32 if dtype=np.float32 (half memory, slightly less precise distances),
+    unless a precomputed one is given (dist_mtrx, e.g., by extend_distance_matrix).
     '''
-    def __init__(self, initialSet):
+    def __init__(self, initialSet, dtype=np.float64, block_memory=2**27, dist_mtrx=None):
         self.initialSet = initialSet
         self.N = initialSet.shape[1]
         self.initProbs = (1/self.N)*np.ones(self.N) #room for generalization
+        self.dtype = dtype
+        self.block_memory = block_memory
+        self.dist_mtrx = dist_mtrx #precomputed distance matrix (optional)
+
+    def _select(self, dist_mtrx, probs, excluded):
+        """
+        It returns the scenario u (not in excluded) that minimizes zeta[u] = probs @ dist_mtrx[u,:].
+        zeta is computed for all the scenarios by one matrix-vector product (in the dtype of the distances),
+        whose summation order differs from the one of a single dot product. Hence, the scenarios
+        within the round-off bound from the minimum are compared again by their own dot product,
+        such that ties are broken exactly as by a scenario-by-scenario computation.
+        """
+        zeta = dist_mtrx @ probs.astype(dist_mtrx.dtype)
+        zeta[excluded] = np.inf
+        #all the terms are non-negative, so the relative error of each zeta is below (N + 2) * eps
+        tol = 8 * (self.N + 2) * np.finfo(dist_mtrx.dtype).eps
+        candidates = np.flatnonzero(zeta <= np.min(zeta) * (1 + tol))
+        return candidates[np.argmin([probs @ dist_mtrx[u, :] for u in candidates])]
 
     def reduce(self, n_scenarios: int = 1):
         """
@@ -23,56 +45,25 @@ class Fast_forward_W2(Scenario_reducer):
         indxR = [] #indeces of the reduced set
         probs_initial = self.initProbs.copy() 
         #### computation of the distance matrix
-        dist_mtrx = np.zeros((self.N,self.N))
-        for i in range(self.N): #sym matrix
-            for j in range(i+1):
-                dist_mtrx[i,j] = np.linalg.norm( self.initialSet[:,i] - self.initialSet[:,j] )
-                dist_mtrx[j,i] = dist_mtrx[i,j]
+        dist_mtrx = self.get_distances()
         dist_mtrx_original = dist_mtrx.copy() #copy of the distance matrix
         #### 
-        J_set = np.arange(self.N)
         ##Step 1
-        zeta = np.zeros(self.N)
-        for u in J_set:
-            tmpProb = probs_initial[u]
-            probs_initial[u] = 0 #set zero that element
-            zeta[u] = probs_initial @ dist_mtrx[u,:]
-            probs_initial[u] = tmpProb #restore the element
-        ##first indx
-        u = np.nanargmin(zeta)
+        #zeta[u] is the sum of the distances from u weighted by the probabilities (the diagonal is zero)
+        u = self._select(dist_mtrx, probs_initial, indxR)
         indxR.append(u)
         ####
         ##Step i
         for it in range(n_scenarios-1): #we already did the first
-            #update the distance matrix
-            dist_mtrx[np.ix_(J_set, J_set)] = np.minimum(dist_mtrx[np.ix_(J_set, J_set)], dist_mtrx[u, J_set])
-            zeta = np.zeros(self.N) #new zeta
+            #update the distance matrix in place: the rows and the columns of the selected scenarios
+            #are updated as well, but they are never employed (their probabilities are set to zero)
+            np.minimum(dist_mtrx, dist_mtrx[u, :].copy(), out=dist_mtrx)
             probs_initial[indxR] = 0 #set zero chosen elements
-            #new J_set
-            J_set = np.setdiff1d(J_set,indxR[-1]) # remove the last selected item
-            for u in J_set:
-                tmpProb = probs_initial[u]
-                probs_initial[u] = 0 #set zero that element
-                zeta[u] = probs_initial @ dist_mtrx[u,:]
-                probs_initial[u] = tmpProb #restore the element
             #new selection
-            zeta[indxR] = np.nan #eliminated indx
-            u = np.nanargmin(zeta)
+            u = self._select(dist_mtrx, probs_initial, indxR)
             indxR.append(u)
-        J_set = np.setdiff1d(J_set,indxR[-1])#last removed
         #### 
         ##Probabilities redistribution
-        probs_initial = self.initProbs.copy()  #re_int
-        probs_reduced = probs_initial[indxR] #probabilities in the reduced set
-        #closest scenario selection
-        #set diag NaN oth it would be the minimum
-        dist_mtrx = dist_mtrx_original
-        dist_mtrx[np.arange(self.N),np.arange(self.N)] = np.nan
-        indx_closest = lambda x: np.nanargmin(dist_mtrx[x,indxR])
-        for toDelete in J_set:
-            probs_reduced[indx_closest(toDelete)] += probs_initial[toDelete]
-        #new probs check
-        if round(np.sum(probs_reduced),2) != 1:
-            raise ValueError('new Probs must sum to one')
+        probs_reduced = self.redistribute(dist_mtrx_original, indxR)
         #returns the reduced set and the respective probabilities
         return self.initialSet[:,indxR],probs_reduced
@@ -0,0 +1,86 @@
+from .scenario_reducer import Scenario_reducer
+from .distances import nearest
+import numpy as np
+
+class KMedoids_W2(Scenario_reducer):
+    '''
+    This class implements an approximate scenario reducer for very large sets of scenarios,
+    based on mini-batch k-medoids with k-means++ seeding (2-norm metric).
+    The N x N distance matrix is never formed: every distance computation involves the
+    reduced set and a chunk of (at most chunk_size) scenarios or a mini-batch (of batch_size) only.
+
+    -Seeding: k-means++, i.e., each new scenario is drawn with probability proportional to the
+    squared distance from the closest scenario already selected.
+    -Refinement: n_iterations mini-batch steps. The scenarios of a batch are assigned to the closest
+    selected scenario, then each selected scenario is replaced by the scenario of its batch cluster
+    that is closest to the cluster mean, if it is closer than the current one
+    (i.e., it minimizes the sum of the squared distances within the cluster).
+    -Probabilities: each scenario moves its probability to the closest selected one (in chunks).
+    After reduce, w2_error holds the Wasserstein-2 distance between the initial and the reduced distribution
+    under this assignment.
+
+    We assume a discrete uniform initial distribution on the scenarios.
+    '''
+    def __init__(self, initialSet, n_iterations=20, batch_size=2048, chunk_size=4096, seed=None):
+        self.initialSet = initialSet
+        self.N = initialSet.shape[1]
+        self.initProbs = (1/self.N)*np.ones(self.N) #room for generalization
+        self.n_iterations = n_iterations
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        self.rng = np.random if seed is None else np.random.RandomState(seed)
+        self.w2_error = None
+
+    def _seeding(self, n_scenarios):
+        #k-means++ seeding
+        indxR = [self.rng.choice(self.N, p=self.initProbs)]
+        sq_dist = np.sum((self.initialSet - self.initialSet[:, indxR]) ** 2, axis=0)
+        for it in range(n_scenarios - 1):
+            weights = self.initProbs * sq_dist
+            if np.sum(weights) <= 0:
+                #every scenario is equal to a selected one (duplicates), the others are drawn uniformly
+                others = np.setdiff1d(np.arange(self.N), indxR)
+                indxR.extend(self.rng.choice(others, n_scenarios - len(indxR), replace=False))
+                break
+            u = self.rng.choice(self.N, p=weights / np.sum(weights))
+            indxR.append(u)
+            sq_dist = np.minimum(sq_dist, np.sum((self.initialSet - self.initialSet[:, [u]]) ** 2, axis=0))
+        return np.array(indxR)
+
+    def _refine(self, indxR):
+        #one mini-batch k-medoids step
+        batch = self.rng.choice(self.N, min(self.batch_size, self.N), replace=False)
+        points = self.initialSet[:, batch]
+        cluster, _ = nearest(points, self.initialSet[:, indxR], self.chunk_size)
+        n_scenarios = len(indxR)
+        counts = np.bincount(cluster, minlength=n_scenarios)
+        means = np.stack(
+            [np.bincount(cluster, weights=row, minlength=n_scenarios) for row in points]
+        ) / np.maximum(counts, 1)
+        #closest scenario of each cluster to its mean
+        sq_dist = np.sum((points - means[:, cluster]) ** 2, axis=0)
+        order = np.lexsort((sq_dist, cluster))
+        first = order[np.searchsorted(cluster[order], np.arange(n_scenarios))[counts > 0]]
+        selected = np.flatnonzero(counts > 0)
+        current = np.sum((self.initialSet[:, indxR[selected]] - means[:, selected]) ** 2, axis=0)
+        better = sq_dist[first] < current
+        indxR[selected[better]] = batch[first[better]]
+        return indxR
+
+    def reduce(self, n_scenarios: int = 1):
+        """
+        reduces the initial set of scenarios
+        """
+        indxR = self._seeding(n_scenarios)
+        for it in range(self.n_iterations):
+            indxR = self._refine(indxR)
+        indxR = np.sort(indxR)
+        ##Probabilities redistribution, to the closest selected scenario
+        closest, sq_dist = nearest(self.initialSet, self.initialSet[:, indxR], self.chunk_size)
+        probs_reduced = np.bincount(closest, weights=self.initProbs, minlength=len(indxR))
+        self.w2_error = np.sqrt(self.initProbs @ sq_dist)
+        #new probs check
+        if round(np.sum(probs_reduced),2) != 1:
+            raise ValueError('new Probs must sum to one')
+        #returns the reduced set and the respective probabilities
+        return self.initialSet[:,indxR],probs_reduced
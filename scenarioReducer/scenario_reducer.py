@@ -1,4 +1,6 @@
 from abc import abstractmethod
+import numpy as np
+from .distances import distance_matrix
 
 class Scenario_reducer():
     '''
@@ -16,6 +18,10 @@ class Scenario_reducer():
     For further details, please refer to:
     [1] Heitsch, Holger, and Werner Römisch. "Scenario reduction algorithms in stochastic programming." Computational optimization and applications 24.2-3 (2003): 187-206.
     '''
+    # reducers whose result depends on the parent node set it to True and implement reduce_conditional,
+    # otherwise ScenarioTree computes one reduction per stage and shares it among all the parents
+    conditional = False
+
     @abstractmethod
     def __init__(self, initialSet):
         """
@@ -28,3 +34,33 @@ class Scenario_reducer():
         reduces the initial set of scenarios
         """   
         pass
+
+    def reduce_conditional(self, n_scenarios: int, history: np.ndarray):
+        """
+        reduces the scenarios given the history (observations from the root to the parent node, one per row).
+        It is called by ScenarioTree for each parent node only if conditional is True
+        """
+        return self.reduce(n_scenarios)
+
+    def get_distances(self):
+        """
+        distance matrix of the initial set: a copy of the precomputed one (dist_mtrx), if given,
+        otherwise it is computed by distance_matrix
+        """
+        if getattr(self, 'dist_mtrx', None) is not None:
+            return np.array(self.dist_mtrx, dtype=self.dtype)
+        return distance_matrix(self.initialSet, self.dtype, self.block_memory)
+
+    def redistribute(self, dist_mtrx, indxR):
+        """
+        optimal redistribution: the probability of each removed scenario
+        goes to the closest scenario of the reduced set indxR (according to dist_mtrx)
+        """
+        J_set = np.setdiff1d(np.arange(self.N), indxR) #removed scenarios
+        probs_reduced = self.initProbs[indxR].copy() #probabilities in the reduced set
+        indx_closest = np.argmin(dist_mtrx[np.ix_(J_set, indxR)], axis=1)
+        np.add.at(probs_reduced, indx_closest, self.initProbs[J_set])
+        #new probs check
+        if round(np.sum(probs_reduced),2) != 1:
+            raise ValueError('new Probs must sum to one')
+        return probs_reduced
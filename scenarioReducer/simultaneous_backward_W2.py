@@ -0,0 +1,71 @@
+from .scenario_reducer import Scenario_reducer
+import numpy as np
+
+class SimultaneousBackward_W2(Scenario_reducer):
+    '''
+    This class implements a scenario reducer that follows
+    a Simultaneous Backward technique with a 2-norm metric.
+
+    At each step, it removes the scenario l that minimizes the distance
+    between the initial distribution and the one supported on the remaining scenarios,
+    i.e., the already removed scenarios are re-assigned as well:
+    z_l = sum_{k in J + l} p_k min_{j not in J + l} c_kj, where J is the set of removed scenarios.
+    The first and the second closest remaining scenario of each scenario are kept,
+    such that z is computed for all the candidates by vectorized operations.
+    Please notice that it is preferred for n>=N/4, where n is the
+    new reduced cardinality and N is the original one.
+
+    We assume a discrete uniform initial distribution on the scenarios.
+    '''
+    def __init__(self, initialSet, dtype=np.float64, block_memory=2**27, dist_mtrx=None):
+        self.initialSet = initialSet
+        self.N = initialSet.shape[1]
+        self.initProbs = (1/self.N)*np.ones(self.N) #room for generalization
+        self.dtype = dtype
+        self.block_memory = block_memory
+        self.dist_mtrx = dist_mtrx #precomputed distance matrix (optional)
+
+    def _two_closest(self, dist_mtrx, rows):
+        # first and second closest remaining scenarios (and distances) of the given rows
+        sub = dist_mtrx[rows]
+        idx = np.argpartition(sub, 1, axis=1)[:, :2]
+        val = np.take_along_axis(sub, idx, axis=1)
+        swap = val[:, 1] < val[:, 0]
+        idx[swap] = idx[swap][:, ::-1]
+        val[swap] = val[swap][:, ::-1]
+        return idx[:, 0], val[:, 0], idx[:, 1], val[:, 1]
+
+    def reduce(self, n_scenarios: int = 1):
+        """
+        reduces the initial set of scenarios
+        """
+        #### computation of the distance matrix
+        dist_mtrx = self.get_distances()
+        dist_mtrx_original = dist_mtrx.copy() #copy of the distance matrix
+        #a scenario is never the closest to itself
+        np.fill_diagonal(dist_mtrx, np.inf)
+        probs = self.initProbs
+        all_rows = np.arange(self.N)
+        closest, dist_closest, second, dist_second = self._two_closest(dist_mtrx, all_rows)
+        removed = np.zeros(self.N, dtype=bool)
+        for it in range(self.N - n_scenarios):
+            #cost of removing l: its own distance plus the increase of the removed scenarios closest to l
+            #(the cost of the other removed scenarios does not depend on l)
+            zeta = probs * dist_closest + np.bincount(
+                closest[removed],
+                weights=probs[removed] * (dist_second[removed] - dist_closest[removed]),
+                minlength=self.N
+            )
+            zeta[removed] = np.inf
+            l = np.argmin(zeta)
+            removed[l] = True
+            #the removed scenario cannot be the closest anymore
+            dist_mtrx[:, l] = np.inf
+            to_update = all_rows[(closest == l) | (second == l)]
+            closest[to_update], dist_closest[to_update], second[to_update], dist_second[to_update] = \
+                self._two_closest(dist_mtrx, to_update)
+        indxR = np.flatnonzero(~removed) #indeces of the reduced set
+        ##Probabilities redistribution
+        probs_reduced = self.redistribute(dist_mtrx_original, indxR)
+        #returns the reduced set and the respective probabilities
+        return self.initialSet[:,indxR],probs_reduced
@@ -48,17 +48,33 @@ class ScenarioTree(nx.DiGraph):
         # Computing total number of scenarios
         self.n_scenarios = prod(self.branching_factors)
         count = 1
+        # arrays of the nodes: parent (-1 for the root), probability, stage and observation
+        parent = [-1]
+        prob = [1.0]
+        stage = [0]
+        obs = [initial_value]
         last_added_nodes = [self.starting_node]
         n_nodes_per_level = 1
+        # reductions already computed, by (stage, reducer, branching factor):
+        # the input of a reducer is the same for all the parents, so it runs once per stage
+        reductions = {}
         # Generating other nodes
         for i in range(self.depth):
             next_level = []
             n_nodes_per_level *= self.branching_factors[i]
+            reducer = stoch_model[i]
+            key = (i, id(reducer), self.branching_factors[i])
             # for each parent node add the children
             for parent_node in last_added_nodes:
-                demand_reduced, probs_reduced = stoch_model[i].reduce(
-                    self.branching_factors[i]
-                )
+                if getattr(reducer, 'conditional', False):
+                    # the children depend on the parent, so they are not shared
+                    demand_reduced, probs_reduced = reducer.reduce_conditional(
+                        self.branching_factors[i], self.get_history_node(parent_node)
+                    )
+                else:
+                    if key not in reductions:
+                        reductions[key] = reducer.reduce(self.branching_factors[i])
+                    demand_reduced, probs_reduced = reductions[key]
                 for j in range(self.branching_factors[i]):
                     id_new_node = count
                     self.add_node(
@@ -70,16 +86,63 @@ class ScenarioTree(nx.DiGraph):
                         stage=i + 1
                     )
                     self.add_edge(parent_node, id_new_node)
+                    parent.append(parent_node)
+                    prob.append(self.nodes[id_new_node]['prob'])
+                    stage.append(i + 1)
+                    obs.append(demand_reduced[:,j])
                     next_level.append(id_new_node)
                     count += 1
             last_added_nodes = next_level
             self.n_nodes = count
         self.leaves = last_added_nodes
+        self.n_nodes = count
+        self.parent = np.array(parent, dtype=int)
+        self.prob = np.array(prob, dtype=float)
+        self.stage = np.array(stage, dtype=int)
+        self.obs = np.column_stack([np.reshape(o, -1) for o in obs]).astype(float)
+
+    def prefix(self, depth: int):
+        """
+        It returns the tree of the first depth stages, i.e., the tree that would be built by the first depth branching factors
+        (the nodes are numbered stage by stage, hence they are the first ones of this tree).
+        The observations and the arrays are shared with this tree, not copied.
+        """
+        if depth > self.depth:
+            raise ValueError(f'The tree has only {self.depth} stages, {depth} requested')
+        n_nodes = 1 + sum(prod(self.branching_factors[:t + 1]) for t in range(depth))
+        n_leaves = prod(self.branching_factors[:depth])
+        tree = ScenarioTree.__new__(ScenarioTree)
+        nx.DiGraph.__init__(tree)
+        tree.add_nodes_from((n, self.nodes[n]) for n in range(n_nodes))
+        tree.add_edges_from(zip(self.parent[1:n_nodes], range(1, n_nodes)))
+        tree.starting_node = self.starting_node
+        tree.dim_observations = self.dim_observations
+        tree.stoch_model = self.stoch_model[:depth]
+        tree.name = self.name
+        tree.breadth_first_search = []
+        tree.depth = depth
+        tree.branching_factors = self.branching_factors[:depth]
+        tree.n_scenarios = n_leaves
+        tree.leaves = list(range(n_nodes - n_leaves, n_nodes))
+        tree.n_nodes = n_nodes
+        tree.parent = self.parent[:n_nodes]
+        tree.prob = self.prob[:n_nodes]
+        tree.stage = self.stage[:n_nodes]
+        tree.obs = self.obs[:, :n_nodes]
+        return tree
 
     def get_leaves(self):
         # Return all the leaves of the tree
         return self.leaves
 
+    def get_scenario_paths(self):
+        # It returns the nodes from the root to each leaf, (n_leaves x depth + 1) array
+        paths = np.zeros((len(self.leaves), self.depth + 1), dtype=int)
+        paths[:, -1] = self.leaves
+        for t in range(self.depth, 0, -1):
+            paths[:, t - 1] = self.parent[paths[:, t]]
+        return paths
+
     def get_history_node(self, n):
         # Given the index of a node, it returns all the observation from it to the root node
         ris = self.nodes[n]['obs'].reshape((1, self.dim_observations))
@@ -101,6 +164,7 @@ class ScenarioTree(nx.DiGraph):
         """
         for t in range(len(self.branching_factors)):
             self.nodes[t]['obs'] = simulation_data[:, t]
+            self.obs[:, t] = simulation_data[:, t]
 
     def print_matrix_form_on_file(self, name_details=""):
         """It prints the tree in a csv file in the folder results.
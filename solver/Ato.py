@@ -21,3 +21,13 @@ class Ato(object):
     @abstractmethod
     def solve(self, instance, scenarios: np.array):
         pass
+
+    def close(self):
+        #it releases the resources of the solver (e.g., pools of processes), nothing by default
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
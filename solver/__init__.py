@@ -1,4 +1,9 @@
-from . import solverGurobi
 from . import Ato
+from . import solverLP
+try:
+    from . import solverGurobi
+except ImportError:
+    # gurobipy is not installed: only the solverLP package (HiGHS backend) is available
+    solverGurobi = None
 
-__all__ = ["solverGurobi","Ato"]
\ No newline at end of file
+__all__ = ["solverGurobi","solverLP","Ato"]
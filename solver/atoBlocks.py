@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import scipy.sparse as sp
+
+# Sparse building blocks of the scenario-based ATO models.
+# Second stage variables are matrices with one column per scenario
+# (e.g., Y of shape n_items x n_scenarios) that are flattened row-wise.
+# Hence, a row of a block is indexed by (row of the original constraint, scenario).
+
+
+def scenario_kron(mat, n_scenarios):
+    """
+    It applies mat to each scenario column of a second stage variable,
+    i.e., the rows of mat @ Y[:, s] for every s.
+    """
+    return sp.kron(sp.csr_matrix(mat), sp.identity(n_scenarios), format='csr')
+
+
+def scenario_copy(n_rows, n_scenarios):
+    """
+    It repeats a first stage vector of n_rows elements on every scenario,
+    with the same row ordering of scenario_kron.
+    """
+    return sp.kron(sp.identity(n_rows), np.ones((n_scenarios, 1)), format='csr')
+
+
+def scenario_dot(vec, n_scenarios):
+    """
+    It computes vec @ Y[:, s] for every scenario s (one row per scenario).
+    """
+    return sp.kron(sp.csr_matrix(np.reshape(vec, (1, -1))), sp.identity(n_scenarios), format='csr')
+
+
+def scenario_weights(vec, probs):
+    """
+    Objective coefficients of a second stage variable, i.e., vec weighted by the
+    probability of each scenario.
+    """
+    return np.outer(vec, probs)
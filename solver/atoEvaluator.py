@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+from solver.atoRecourse import AtoRecourse
+
+
+class AtoEvaluator(AtoRecourse):
+    """
+    Out-of-sample evaluation of a fixed first stage decision.
+    The components X (plus the inventory) are allocated to the demand of each scenario by the recourse problem,
+    solved in chunks of chunk_size scenarios and, with n_workers > 1, by a pool of processes.
+    Hence, a large number of samples never ends up in one single model.
+    """
+    def __init__(self, instance, chunk_size=500, n_workers=1, backend='highs'):
+        super().__init__(instance, chunk_size=chunk_size, n_workers=n_workers, backend=backend)
+        #the inventory is read at each evaluation, since the environment updates it period after period
+        self.instance = instance
+
+    def evaluate(self, X, demand, inventory=None):
+        """
+        :param X: produced components
+        :param demand: (n_items x n_scenarios) demand samples
+        :param inventory: initial inventory of the components (if None, the current one of the instance)
+        :return: dict of arrays with the second stage profit of each scenario ('profit', n_scenarios),
+            the sold items ('sales') and the lost sales ('lost_sales') in (n_items x n_scenarios),
+            and the leftover components ('leftover') in (n_components x n_scenarios)
+        """
+        if inventory is None:
+            inventory = np.array(self.instance.inventory, dtype=float)
+        res = self.solve(np.asarray(X, dtype=float) + inventory, demand, details=True)
+        del res['duals']
+        return res
+
+    def expected_profit(self, X, demand, inventory=None):
+        """
+        It returns the sample mean of the second stage profit and its standard error
+        (e.g., to estimate the optimality gap of a SAA solution).
+        """
+        profit = self.evaluate(X, demand, inventory)['profit']
+        return np.mean(profit), np.std(profit, ddof=1) / np.sqrt(profit.size)
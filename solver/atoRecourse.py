@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import scipy.sparse as sp
+from concurrent.futures import ProcessPoolExecutor
+from solver.linearProgram import LinearProgram
+
+
+def recourse_lp(data, supply, demand):
+    """
+    It builds the recourse problem of a chunk of scenarios as one block-diagonal LinearProgram.
+    :param data: dict with the gozinto matrix, the profits, the lost sales and the holding costs
+    :param supply: available components (X + I), common to every scenario
+    :param demand: (n_items x n_scenarios) demand of the chunk
+    """
+    n_items, n_scenarios = demand.shape
+    n_components = data['gozinto'].shape[1]
+    lp = LinearProgram("recourse", maximize=True)
+    #sold items, lost sales and components not sold
+    lp.add_var('Y', (n_items, n_scenarios), obj=np.outer(data['profits'], np.ones(n_scenarios)))
+    lp.add_var('L', (n_items, n_scenarios), obj=-np.outer(data['lost_sales'], np.ones(n_scenarios)))
+    lp.add_var('Z', (n_components, n_scenarios), obj=-np.outer(data['holding_costs'], np.ones(n_scenarios)))
+    # Demand and lost sales
+    lp.add_constr(
+        "demand_constr",
+        {'Y': sp.identity(demand.size), 'L': sp.identity(demand.size)},
+        '=',
+        demand
+    )
+    # End items building (rows ordered by component and scenario)
+    lp.add_constr(
+        "end_item_building",
+        {
+            'Y': sp.kron(sp.csr_matrix(data['gozinto'].T), sp.identity(n_scenarios), format='csr'),
+            'Z': sp.identity(n_components * n_scenarios)
+        },
+        '=',
+        np.repeat(supply, n_scenarios)
+    )
+    return lp
+
+
+def solve_recourse_chunk(data, supply, demand, backend='highs', details=False):
+    """
+    It solves the recourse problem of a chunk of scenarios.
+    :return: dict with the profit of each scenario ('profit'), the sensitivity of each profit
+        w.r.t. the supply ('duals', n_components x n_scenarios) and, if details,
+        the sold items ('sales'), the lost sales ('lost_sales') and the leftover components ('leftover')
+    """
+    n_scenarios = demand.shape[1]
+    n_components = data['gozinto'].shape[1]
+    sol = recourse_lp(data, supply, demand).solve(backend=backend)
+    if not sol.optimal:
+        raise ValueError('Recourse problem not solved to optimality')
+    Y = sol.get_value('Y')
+    L = sol.get_value('L')
+    Z = sol.get_value('Z')
+    res = {
+        'profit': data['profits'] @ Y - data['lost_sales'] @ L - data['holding_costs'] @ Z,
+        'duals': sol.get_dual('end_item_building', (n_components, n_scenarios))
+    }
+    if details:
+        res['sales'] = Y
+        res['lost_sales'] = L
+        res['leftover'] = Z
+    return res
+
+
+class AtoRecourse():
+    """
+    Second stage (recourse) problem of the ATO models with lost sales and holding costs.
+    Given the available components (supply), each scenario s allocates them to the end items:
+        max profits @ Y_s - lost_sales @ L_s - holding_costs @ Z_s
+        s.t. gozinto.T @ Y_s + Z_s == supply,  Y_s + L_s == d_s
+    The scenarios are independent, hence they are solved in chunks of chunk_size scenarios
+    and, with n_workers > 1, by a pool of processes. Only one chunk per worker is in memory at a time.
+    """
+    def __init__(self, instance, chunk_size=500, n_workers=1, backend='highs'):
+        self.set_instance(instance)
+        self.chunk_size = chunk_size
+        self.n_workers = n_workers
+        self.backend = backend
+        self.pool = None
+
+    def set_instance(self, instance):
+        #it (re)loads the data of the instance, the pool of processes (if any) is kept
+        self.data = {
+            'gozinto': np.array(instance.gozinto, dtype=float),
+            'profits': np.array(instance.profits, dtype=float),
+            'lost_sales': np.array(instance.lost_sales, dtype=float),
+            'holding_costs': instance.holding_costs * np.ones(instance.n_components)
+        }
+
+    def solve(self, supply, demand, details=False):
+        """
+        It solves the recourse problem of every scenario (column) of demand.
+        :return: the same dict of solve_recourse_chunk on all the scenarios
+        """
+        supply = np.asarray(supply, dtype=float)
+        chunks = [
+            demand[:, i:i + self.chunk_size]
+            for i in range(0, demand.shape[1], self.chunk_size)
+        ]
+        if self.n_workers > 1 and len(chunks) > 1:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(max_workers=self.n_workers)
+            futures = [
+                self.pool.submit(solve_recourse_chunk, self.data, supply, chunk, self.backend, details)
+                for chunk in chunks
+            ]
+            results = [f.result() for f in futures]
+        else:
+            results = [
+                solve_recourse_chunk(self.data, supply, chunk, self.backend, details)
+                for chunk in chunks
+            ]
+        return {
+            key: np.concatenate([r[key] for r in results], axis=-1)
+            for key in results[0]
+        }
+
+    def close(self):
+        #it shuts down the pool of processes (if any)
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+import hashlib
+from collections import OrderedDict
+import numpy as np
+from scenarioTree import ScenarioTree
+from scenarioReducer import *
+
+
+class DummyScenarioReducer(Scenario_reducer):
+    """
+    Fake scenario reducer that is employed when the number of requested branch is just 1
+    When this happen, the reduction boils down to the average of the available data
+    """   
+    def __init__(self, data):
+        self.data = data
+
+    def reduce(self, n):
+        tmp = np.average(
+            self.data,
+            axis=1
+        )
+        demand_reduced = np.reshape(tmp,(tmp.size, 1))
+        probs_reduced = [1]
+        return demand_reduced, probs_reduced 
+
+
+class ReducedSet(Scenario_reducer):
+    """
+    Scenario reducer whose reduction has already been computed (see AtoTree.reduce_stage)
+    """
+    def __init__(self, demand_reduced, probs_reduced):
+        self.demand_reduced = demand_reduced
+        self.probs_reduced = probs_reduced
+
+    def reduce(self, n):
+        return self.demand_reduced, self.probs_reduced
+
+
+class AtoTree():
+    """
+    Scenario tree of the multi-stage ATO solvers, whatever the optimization software.
+    The subclasses must set self.branching_factors, self.seas and self.current.
+    """
+    def __init__(self, **setting):
+        super().__init__(**setting)
+        #data, distance matrix and reductions of each season index, see reduce_stage
+        self.reduction_cache = {}
+        #trees shared with other solvers (optional), see ScenarioTreeStore
+        self.tree_store = setting.get('tree_store', None)
+
+    def seasonalize(self,seasonality):
+        #saves the seasonality factors
+        self.seas = seasonality
+        self.reduction_cache = {}
+    
+    def updateClock(self):
+        # the clock is necessary to use the right data in case of multiple stages with seasonality
+        self.current += 1
+
+    def reduce_stage(self, selected_data, season, n):
+        """
+        It reduces the data of a season index to n scenarios (the reduced set and its probabilities).
+        In a rolling horizon the history only grows, so the data of a season is either the same of the last periods
+        or it has one more observation: the reductions are kept by (season index, history length, branching factor)
+        and the distance matrix of each season is extended by the new observations instead of being recomputed.
+        The cache is reset if the stored data is not the beginning of the given one.
+        """
+        N = selected_data.shape[1]
+        entry = self.reduction_cache.get(season)
+        if entry is None or entry['data'].shape[1] > N or \
+                not np.array_equal(entry['data'], selected_data[:, :entry['data'].shape[1]]):
+            entry = {'data': selected_data[:, :0], 'dist': None, 'reductions': {}}
+            self.reduction_cache[season] = entry
+        if entry['data'].shape[1] < N:
+            #the reductions of a shorter history are never employed again
+            entry['data'] = selected_data.copy()
+            entry['reductions'] = {}
+        if n in entry['reductions']:
+            return entry['reductions'][n]
+        if n > 1:
+            if entry['dist'] is None:
+                entry['dist'] = distance_matrix(selected_data)
+            elif entry['dist'].shape[0] < N:
+                entry['dist'] = extend_distance_matrix(entry['dist'], selected_data)
+        #Reduction of the number of nodes according to a W2 scenario reducer:
+        #fast forward if the reduced set is small (n < N/4), simultaneous backward otherwise
+        if n > 1 and n < N / 4:
+            reducer = Fast_forward_W2(selected_data, dist_mtrx=entry['dist'])
+        elif n > 1:
+            reducer = SimultaneousBackward_W2(selected_data, dist_mtrx=entry['dist'])
+        else: #here the reduction boils down to the average
+            reducer = DummyScenarioReducer(selected_data)
+        entry['reductions'][n] = reducer.reduce(n)
+        return entry['reductions'][n]
+
+    def build_tree(self, instance, scenarios, present_demand):
+        if self.tree_store is not None:
+            return self.tree_store.get(self, instance, scenarios, present_demand)
+        return self.make_tree(instance, scenarios, present_demand, self.branching_factors)
+
+    def make_tree(self, instance, scenarios, present_demand, branching_factors):
+        reducers = []
+        for i in range(len(branching_factors)): #the length of the horizon is given by the branching factors specification
+            #selection of the data w.r.t. the seasonality. (We assume that we cannot use data from months with peaks of demand to decide on months with low demand)
+            season = (self.current + i + 1) % self.seas
+            selected_data = scenarios[:,np.arange(season, len(scenarios[0,:]), self.seas)]
+            reducers.append(
+                ReducedSet(
+                    *self.reduce_stage(selected_data, season, branching_factors[i])
+                )
+            )
+        #scenario tree building
+        scenario_tree = ScenarioTree(
+            name='tree1',
+            branching_factors=branching_factors,
+            dim_observations=instance.n_items,
+            initial_value=present_demand,
+            stoch_model=reducers
+        )
+        return scenario_tree
+
+
+class ScenarioTreeStore():
+    """
+    Scenario trees shared by the multi-stage solvers that decide on the same history at the same period,
+    e.g., the policies whose branching factors differ only in the last stages ([ye, ye], [ye, ye, 1], [ye, ye, 1, 1]).
+    The nodes of the first stages of a tree do not depend on the following ones, so the tree is built once,
+    by the longest registered branching factors that start with the requested ones, and the shorter configurations
+    get its prefix (ScenarioTree.prefix).
+    The trees are kept by (history fingerprint, period, seasonality) and branching factors and they are shared:
+    they must not be modified by the solvers.
+    At most max_trees trees are kept: the least recently employed keys are dropped first.
+    """
+    def __init__(self, branching_factors_list=(), max_trees=256):
+        self.branching_factors_list = []
+        for branching_factors in branching_factors_list:
+            self.register(branching_factors)
+        self.max_trees = max_trees
+        self.trees = OrderedDict()
+        self.n_trees = 0
+
+    def register(self, branching_factors):
+        #configurations that will be requested, the longest one is built
+        if list(branching_factors) not in self.branching_factors_list:
+            self.branching_factors_list.append(list(branching_factors))
+
+    def clear(self):
+        self.trees = OrderedDict()
+        self.n_trees = 0
+
+    @staticmethod
+    def fingerprint(scenarios, present_demand):
+        # hash of the historical data and of the present demand (the root of the tree)
+        h = hashlib.sha1()
+        for ele in (scenarios, present_demand):
+            ele = np.ascontiguousarray(ele, dtype=float)
+            h.update(str(ele.shape).encode())
+            h.update(ele.tobytes())
+        return h.hexdigest()
+
+    def get(self, solver, instance, scenarios, present_demand):
+        """
+        It returns the tree of the solver (AtoTree) for the given data, built by the solver itself if not available.
+        """
+        branching_factors = list(solver.branching_factors)
+        depth = len(branching_factors)
+        self.register(branching_factors)
+        key = (self.fingerprint(scenarios, present_demand), solver.current, solver.seas)
+        trees = self.trees.setdefault(key, [])
+        self.trees.move_to_end(key)
+        for tree in trees:
+            if list(tree.branching_factors[:depth]) == branching_factors:
+                return tree if tree.depth == depth else tree.prefix(depth)
+        longest = max(
+            (ele for ele in self.branching_factors_list if ele[:depth] == branching_factors),
+            key=len
+        )
+        tree = solver.make_tree(instance, scenarios, present_demand, longest)
+        trees.append(tree)
+        self.n_trees += 1
+        #the least recently employed keys are dropped (never the current one)
+        while self.n_trees > self.max_trees and len(self.trees) > 1:
+            _, dropped = self.trees.popitem(last=False)
+            self.n_trees -= len(dropped)
+        return tree if tree.depth == depth else tree.prefix(depth)
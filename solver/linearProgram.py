@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+import time
+import numpy as np
+import scipy.sparse as sp
+from scipy.optimize import linprog
+
+# Backends that can solve a LinearProgram
+BACKENDS = ['highs', 'gurobi']
+
+
+class LinearProgram():
+    """
+    Linear program in matrix form that does not depend on the optimization software.
+    Variables and constraints are organised in named blocks:
+    -a block of variables has a shape (e.g., n_items x n_scenarios) and it is flattened row-wise;
+    -a block of constraints is a set of sparse rows, one matrix per involved block of variables.
+    Once built, the same program can be solved by scipy (HiGHS) or by Gurobi,
+    or converted to a gurobipy model (see to_gurobi) that the solverGurobi classes modify in place.
+    """
+    def __init__(self, name, maximize=True):
+        self.name = name
+        self.maximize = maximize
+        # name -> (first index, shape)
+        self.vars = {}
+        self.n_vars = 0
+        self.obj = []
+        self.lb = []
+        self.ub = []
+        # name -> (sense, first row, n_rows)
+        self.constrs = {}
+        # name -> shape of the block of constraints (the one of its rhs)
+        self.constr_shapes = {}
+        self.n_constrs = 0
+        self.rows = []
+        self.senses = []
+        self.rhs = []
+
+    def add_var(self, name, shape, obj=0.0, lb=0.0, ub=np.inf):
+        """
+        It adds a block of continuous variables. obj, lb and ub are scalars or arrays of the given shape.
+        """
+        size = int(np.prod(shape))
+        self.vars[name] = (self.n_vars, shape)
+        self.n_vars += size
+        self.obj.append(np.broadcast_to(obj, shape).flatten().astype(float))
+        self.lb.append(np.broadcast_to(lb, shape).flatten().astype(float))
+        self.ub.append(np.broadcast_to(ub, shape).flatten().astype(float))
+
+    def add_constr(self, name, terms, sense, rhs):
+        """
+        It adds a block of constraints sum(terms[v] @ v) sense rhs,
+        where terms maps the name of a block of variables to its (sparse) coefficient matrix
+        and sense is one of '<', '>', '='.
+        The shape of rhs (e.g., n_items x n_scenarios) is the shape of the block, and it is flattened row-wise.
+        """
+        rhs = np.atleast_1d(np.asarray(rhs, dtype=float))
+        self.constr_shapes[name] = rhs.shape
+        rhs = rhs.flatten()
+        self.constrs[name] = (sense, self.n_constrs, rhs.size)
+        self.n_constrs += rhs.size
+        self.rows.append(terms)
+        self.senses.append(sense)
+        self.rhs.append(rhs)
+
+    def get_matrix(self, terms, n_rows):
+        # it assembles the rows of a block of constraints on the whole vector of variables
+        blocks = []
+        for name, (_, shape) in self.vars.items():
+            if name in terms:
+                blocks.append(sp.csr_matrix(terms[name]))
+            else:
+                blocks.append(sp.csr_matrix((n_rows, int(np.prod(shape)))))
+        return sp.hstack(blocks, format='csr')
+
+    def get_value(self, x, name):
+        """
+        It returns the values of a block of variables from the vector x
+        """
+        start, shape = self.vars[name]
+        return np.reshape(x[start:start + int(np.prod(shape))], shape)
+
+    def solve(self, backend='highs', time_limit=None, verbose=False):
+        """
+        It solves the linear program with the given backend.
+        :return: a LinearProgramSolution
+        """
+        if backend == 'highs':
+            return self._solve_highs(time_limit, verbose)
+        elif backend == 'gurobi':
+            return self._solve_gurobi(time_limit, verbose)
+        else:
+            raise ValueError(f'Backend {backend} not available, use one of {BACKENDS}')
+
+    def _solve_highs(self, time_limit, verbose):
+        c = np.concatenate(self.obj)
+        sign = -1.0 if self.maximize else 1.0
+        ub_rows, ub_rhs, eq_rows, eq_rhs = [], [], [], []
+        for terms, sense, rhs in zip(self.rows, self.senses, self.rhs):
+            mat = self.get_matrix(terms, rhs.size)
+            if sense == '=':
+                eq_rows.append(mat)
+                eq_rhs.append(rhs)
+            elif sense == '<':
+                ub_rows.append(mat)
+                ub_rhs.append(rhs)
+            else:
+                ub_rows.append(-mat)
+                ub_rhs.append(-rhs)
+        options = {'disp': verbose}
+        if time_limit:
+            options['time_limit'] = time_limit
+        start = time.time()
+        res = linprog(
+            sign * c,
+            A_ub=sp.vstack(ub_rows, format='csr') if ub_rows else None,
+            b_ub=np.concatenate(ub_rhs) if ub_rows else None,
+            A_eq=sp.vstack(eq_rows, format='csr') if eq_rows else None,
+            b_eq=np.concatenate(eq_rhs) if eq_rows else None,
+            bounds=np.column_stack((np.concatenate(self.lb), np.concatenate(self.ub))),
+            method='highs',
+            options=options
+        )
+        comp_time = time.time() - start
+        if res.status != 0:
+            return LinearProgramSolution(self, False, None, None, {}, comp_time, res.nit)
+        # duals as sensitivity of the objective w.r.t. the rhs (as the Pi attribute in Gurobi)
+        duals = {}
+        pos_ub, pos_eq = 0, 0
+        for name, (sense, _, n_rows) in self.constrs.items():
+            if sense == '=':
+                duals[name] = sign * res.eqlin.marginals[pos_eq:pos_eq + n_rows]
+                pos_eq += n_rows
+            else:
+                row_sign = 1.0 if sense == '<' else -1.0
+                duals[name] = sign * row_sign * res.ineqlin.marginals[pos_ub:pos_ub + n_rows]
+                pos_ub += n_rows
+        return LinearProgramSolution(self, True, sign * res.fun, res.x, duals, comp_time, res.nit)
+
+    def to_gurobi(self):
+        """
+        It builds the gurobipy model of the linear program, with one MVar (named and shaped as the block)
+        per block of variables and one MConstr per block of constraints.
+        :return: the model, the dict of the MVar and the dict of the MConstr
+        """
+        # gurobipy is imported only when required, such that license-free workers can employ highs
+        import gurobipy as grb
+        model = grb.Model(self.name)
+        variables = {}
+        for (name, (_, shape)), obj, lb, ub in zip(self.vars.items(), self.obj, self.lb, self.ub):
+            variables[name] = model.addMVar(
+                shape=shape,
+                lb=np.reshape(lb, shape),
+                ub=np.reshape(ub, shape),
+                obj=np.reshape(obj, shape),
+                vtype=grb.GRB.CONTINUOUS,
+                name=name
+            )
+        model.ModelSense = grb.GRB.MAXIMIZE if self.maximize else grb.GRB.MINIMIZE
+        grb_senses = {'<': grb.GRB.LESS_EQUAL, '>': grb.GRB.GREATER_EQUAL, '=': grb.GRB.EQUAL}
+        constraints = {}
+        for name, terms, sense, rhs in zip(self.constrs, self.rows, self.senses, self.rhs):
+            # only the blocks of variables in the terms are involved
+            constraints[name] = model.addMConstr(
+                sp.hstack([sp.csr_matrix(terms[v]) for v in terms], format='csr'),
+                grb.hstack([variables[v].reshape(-1) for v in terms]),
+                grb_senses[sense],
+                rhs,
+                name=name
+            )
+        model.update()
+        return model, variables, constraints
+
+    def _solve_gurobi(self, time_limit, verbose):
+        import gurobipy as grb
+        model, variables, constraints = self.to_gurobi()
+        model.setParam('OutputFlag', 1 if verbose else 0)
+        if time_limit:
+            model.setParam(grb.GRB.Param.TimeLimit, time_limit)
+        start = time.time()
+        model.optimize()
+        comp_time = time.time() - start
+        if model.status != grb.GRB.Status.OPTIMAL:
+            return LinearProgramSolution(self, False, None, None, {}, comp_time, model.IterCount)
+        x = np.concatenate([var.X.flatten() for var in variables.values()])
+        duals = {name: mconstr.Pi for name, mconstr in constraints.items()}
+        sol = LinearProgramSolution(self, True, model.ObjVal, x, duals, comp_time, model.IterCount)
+        model.dispose()
+        return sol
+
+
+class LinearProgramSolution():
+    """
+    Solution of a LinearProgram, whatever the backend.
+    Duals are the sensitivities of the objective function w.r.t. the rhs of each block of constraints.
+    """
+    def __init__(self, lp, optimal, of, x, duals, comp_time, iterations):
+        self.lp = lp
+        self.optimal = optimal
+        self.of = of
+        self.x = x
+        self.duals = duals
+        self.comp_time = comp_time
+        self.iterations = iterations
+
+    def get_value(self, name):
+        return self.lp.get_value(self.x, name)
+
+    def get_dual(self, name, shape=None):
+        if shape is None:
+            return self.duals[name]
+        return np.reshape(self.duals[name], shape)
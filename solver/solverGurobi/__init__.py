@@ -5,9 +5,11 @@ from .atoG_multi import AtoG_multi
 from .atoCVaRProfit import AtoCVaRProfit
 from .atoRP import AtoRP
 from .atoRP_multi import AtoRP_multi
+from .atoRP_multi_LShaped import AtoRP_multi_LShaped
 from .atoPI import AtoPI
 from .atoRP_approx_comp import AtoRP_approx_comp, AtoRP_approx_comp_v
 from .atoRPMultiStage import AtoRPMultiStage
+from .atoRPMultiStage_PH import AtoRPMultiStage_PH
 
 __all__ = [
     "AtoCVaR",
@@ -16,9 +18,11 @@ __all__ = [
     "AtoG_multi",
     "AtoRP",
     "AtoRP_multi",
+    "AtoRP_multi_LShaped",
     "AtoPI",
     "AtoCVaRProfit",
     "AtoRP_approx_comp",
     "AtoRP_approx_comp_v",
-    "AtoRPMultiStage"
+    "AtoRPMultiStage",
+    "AtoRPMultiStage_PH"
 ]
@@ -7,15 +7,20 @@ from solver.Ato import Ato
 
 class AtoG(Ato):
     """
-    Interface (super-class) of assembly-to-order solver. Specifications in the subclasses
+    Interface (super-class) of assembly-to-order solver. Specifications in the subclasses.
+    The models shared with solverLP are not written again: the subclass sets self.definition to the
+    solverLP class of the model, whose LinearProgram is converted to a gurobipy model by populate.
     """
     def __init__(self,**setting):
         self.name = "atoG"
         self.setting = setting
+        # solverLP model that defines the LinearProgram, if any
+        self.definition = None
 
     def populate(self, instance, scenarios):
-        #it initializes the model.
-        pass
+        #it initializes the model (from the LinearProgram of the definition, by default).
+        model, _, _ = self.definition.populate(instance, scenarios).to_gurobi()
+        return model
 
     def get_solution(self, instance, model, time_limit=None, gap=None, verbose=False):
         #This method solves the actual model, while the different subclasses 
@@ -45,7 +50,7 @@ class AtoG(Ato):
                     "X[{}]".format(i)
                 )
                 sol[i] = grb_var.X
-            of = model.getObjective().getValue()
+            of = model.ObjVal
             model.reset()
             return of, sol, comp_time
         else:
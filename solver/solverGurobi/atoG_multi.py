@@ -7,17 +7,42 @@ from solver.Ato import Ato
 
 class AtoG_multi(Ato):
     """
-    Interface (super-class) of assembly-to-order solver on multi-stage problems. Specifications in the subclasses
+    Interface (super-class) of assembly-to-order solver on multi-stage problems. Specifications in the subclasses.
+    The models shared with solverLP are built from the LinearProgram of their solverLP definition, see build.
     """
     def __init__(self,**setting):
         self.name = "atoG_multi"
         self.setting = setting
+        # a persistent solver builds its model once and then updates it in place
+        self.persistent = self.setting.get('persistent', False)
+        self.model = None
+        # blocks (variables and constraints) of the model, see add_block
+        self.blocks = {}
+        # demand constraints (MConstr) of the current model, if kept by the subclass, see change_rhs
+        self.demand_constr = None
+        # basis and simplex iterations of the last solved model
+        self.basis = None
+        self.iter_count = 0
 
     def populate(self, instance, scenarios, present_demand):
         #it initializes the model.
         pass
 
-    def get_solution(self, instance, model, time_limit=None, gap=None, verbose=False):
+    def build(self, lp):
+        """
+        It converts the LinearProgram lp to a gurobipy model and it registers all its blocks
+        (with the shapes of the LinearProgram) for the warm start.
+        :return: the model, the dict of the MVar and the dict of the MConstr
+        """
+        model, variables, constraints = lp.to_gurobi()
+        self.blocks = {}
+        for name, var in variables.items():
+            self.add_block(name, var)
+        for name, constr in constraints.items():
+            self.add_block(name, constr, lp.constr_shapes[name])
+        return model, variables, constraints
+
+    def get_solution(self, instance, model, time_limit=None, gap=None, verbose=False, keep_basis=False):
         #This method solves the actual model, while the different subclasses 
         #modify the population method (thus the characteristics of a particular model)
         if gap:
@@ -35,18 +60,23 @@ class AtoG_multi(Ato):
         model.optimize()
         end = time.time()
         comp_time = end - start
+        self.iter_count = model.IterCount
         # print("Time to solve {}: {:.2f} [s]".format(self.name, comp_time))
         if model.status == grb.GRB.Status.OPTIMAL:
             solX = self.X.X
             solY = self.Y.X
-            of = model.getObjective().getValue()
-            model.reset()
+            of = model.ObjVal
+            if keep_basis:
+                self.basis = self.get_basis(model)
+            if not self.persistent:
+                #a persistent model keeps its basis to re-optimize the next period
+                model.reset()
             return of, solX, solY, comp_time
         else:
             return -1, [], [], comp_time
 
     def solve(
-        self, instance, scenarios, present_demand, time_limit=None, gap=None, verbose=False
+        self, instance, scenarios, present_demand, time_limit=None, gap=None, verbose=False, warm_start=None
     ):
         """
         Solve is the method where the problem is stated and then solved.
@@ -54,12 +84,88 @@ class AtoG_multi(Ato):
         :param time_limit: to interrupt the gurobi twoStageSolver with a non optimal solution in case of strict time schedule
         :param gap: if not None, gurobi stops when finding a solution near "gap" to the optimal value
         :param verbose: parameters to be passed to gurobipy package for verbose or not output
+        :param warm_start: if not None, the basis (as in self.basis) of a previous solve that initializes
+            a new model. The basis of this solve is then saved in self.basis. An empty dict only saves it.
         :return: first stage solution in a dict_data['n_components'] array
         """
-        model = self.populate(instance, scenarios, present_demand)
-        return self.get_solution(instance, model, time_limit=time_limit, gap=gap, verbose=verbose)
+        if self.persistent and self.model is not None:
+            model = self.update(instance, scenarios, present_demand)
+        else:
+            model = self.populate(instance, scenarios, present_demand)
+        #a model updated in place already starts from its previous basis
+        if warm_start and model is not self.model:
+            self.set_basis(model, warm_start)
+        if self.persistent:
+            self.model = model
+        return self.get_solution(
+            instance, model, time_limit=time_limit, gap=gap, verbose=verbose,
+            keep_basis=warm_start is not None
+        )
+
+    def update(self, instance, scenarios, present_demand):
+        #it modifies the persistent model w.r.t. the new data.
+        #By default, the model is simply built again.
+        return self.populate(instance, scenarios, present_demand)
+
+    def add_block(self, name, handle, shape=None):
+        """
+        It registers a block of variables (MVar) or constraints (MConstr or list of Constr)
+        of the current model. The shape is the logical one, e.g., (n_items, n_scenarios),
+        and it is employed to map the basis among models with a different number of scenarios.
+        """
+        if shape is None:
+            shape = handle.shape
+        if isinstance(handle, list):
+            #scalar matrix constraints are converted to plain constraints
+            handle = [c.tolist() if isinstance(c, grb.MConstr) else c for c in handle]
+        self.blocks[name] = (handle, shape)
+
+    def get_basis(self, model):
+        """
+        It returns the basis of the solved model as a dict with one array per block
+        """
+        basis = {}
+        for name, (handle, shape) in self.blocks.items():
+            attr = 'VBasis' if isinstance(handle, grb.MVar) else 'CBasis'
+            basis[name] = np.reshape(self._get_attr(model, handle, attr), shape)
+        return basis
+
+    def set_basis(self, model, basis):
+        """
+        It sets the starting basis of the model from the basis of a previous model.
+        Blocks are matched by name and the overlapping part of their shapes is copied.
+        The remaining variables are nonbasic at their lower bound and the remaining constraints are basic,
+        so a basis that gains new scenarios is still a valid one.
+        """
+        if len(self.blocks) == 0:
+            return
+        for name, (handle, shape) in self.blocks.items():
+            is_var = isinstance(handle, grb.MVar)
+            values = np.full(shape, -1 if is_var else 0, dtype=int)
+            old = basis.get(name)
+            if old is not None and old.ndim == len(shape):
+                overlap = tuple(slice(0, min(a, b)) for a, b in zip(old.shape, shape))
+                values[overlap] = old[overlap]
+            self._set_attr(model, handle, 'VBasis' if is_var else 'CBasis', values)
+
+    def _get_attr(self, model, handle, attr):
+        #attribute values of a block
+        if isinstance(handle, list):
+            return model.getAttr(attr, handle)
+        return handle.getAttr(attr)
+
+    def _set_attr(self, model, handle, attr, values):
+        #it sets the attribute values of a block
+        if isinstance(handle, list):
+            model.setAttr(attr, handle, values.flatten().tolist())
+        else:
+            handle.setAttr(attr, values.reshape(handle.shape))
 
     def change_rhs(self, model, new_set_scenarios):
+        if self.demand_constr is not None:
+            #the handle avoids listing all the constraints of the model
+            self.demand_constr.RHS = new_set_scenarios.flatten()
+            return model
         model.setAttr(
             "RHS",
             model.getConstrs()[0:np.prod(new_set_scenarios.shape)],
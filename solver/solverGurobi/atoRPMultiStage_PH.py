@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+import time
+import warnings
+import numpy as np
+import scipy.sparse as sp
+import gurobipy as grb
+from concurrent.futures import ProcessPoolExecutor
+from solver.solverGurobi.atoG_multi import AtoG_multi
+from solver.atoTree import AtoTree
+from solver.atoBlocks import scenario_kron
+
+
+def solve_scenario_chunk(data, obs, probs, W_X, W_Y, xbar_X, xbar_Y, rho_X, rho_Y):
+    """
+    It solves the progressive hedging subproblems of a chunk of root-to-leaf scenarios as one model.
+    Arrays of the decisions are (n_rows x n_stages x n_scenarios), obs is (n_items x n_stages x n_scenarios).
+    Each scenario minimizes its cost plus W @ x + rho / 2 ||x - xbar||^2 on the production X and the sales Y.
+    :return: X, Y and the profit of each scenario (without the penalties)
+    """
+    n_items, n_stages, n_scenarios = obs.shape
+    n_components = data['gozinto'].shape[1]
+    n_blocks = n_stages * n_scenarios
+    weights = np.reshape(probs, (1, 1, n_scenarios))
+    model = grb.Model("ph_scenarios")
+    X = model.addMVar(shape=n_components * n_blocks, vtype=grb.GRB.CONTINUOUS, name='X')
+    Y = model.addMVar(shape=n_items * n_blocks, vtype=grb.GRB.CONTINUOUS, name='Y')
+    L = model.addMVar(shape=n_items * n_blocks, vtype=grb.GRB.CONTINUOUS, name='L')
+    I = model.addMVar(shape=n_components * n_blocks, vtype=grb.GRB.CONTINUOUS, name='I')
+    #costs (profits with a negative sign) weighted by the probability of the scenario
+    ones = np.ones((1, n_stages, n_scenarios))
+    c_X = weights * (data['costs'][:, None, None] * ones + W_X - rho_X * xbar_X)
+    c_Y = weights * (-data['profits'][:, None, None] * ones + W_Y - rho_Y * xbar_Y)
+    c_L = weights * data['lost_sales'][:, None, None] * ones
+    c_I = weights * data['holding_costs'][:, None, None] * ones
+    q_X = sp.diags(np.broadcast_to(weights * rho_X / 2.0, W_X.shape).flatten())
+    q_Y = sp.diags(np.broadcast_to(weights * rho_Y / 2.0, W_Y.shape).flatten())
+    model.setObjective(
+        c_X.flatten() @ X + c_Y.flatten() @ Y + c_L.flatten() @ L + c_I.flatten() @ I
+        + X @ q_X @ X + Y @ q_Y @ Y,
+        grb.GRB.MINIMIZE
+    )
+    # Capacity constraint for each machine
+    model.addMConstr(
+        scenario_kron(data['processing_time'].T, n_blocks),
+        X,
+        grb.GRB.LESS_EQUAL,
+        np.repeat(data['availability'], n_blocks)
+    )
+    # Demand and lost sales
+    model.addMConstr(
+        sp.hstack([sp.identity(Y.size), sp.identity(L.size)]),
+        grb.hstack((Y, L)),
+        grb.GRB.EQUAL,
+        obs.flatten()
+    )
+    # Initial condition and evolution (the previous stage of the same scenario is n_scenarios blocks before)
+    previous = sp.eye(n_blocks, k=-n_scenarios)
+    rhs = np.zeros((n_components, n_stages, n_scenarios))
+    rhs[:, 0, :] = data['inventory'][:, None]
+    model.addMConstr(
+        sp.hstack([
+            sp.kron(sp.identity(n_components), sp.identity(n_blocks) - previous),
+            scenario_kron(data['gozinto'].T, n_blocks),
+            -sp.kron(sp.identity(n_components), previous)
+        ]),
+        grb.hstack((I, Y, X)),
+        grb.GRB.EQUAL,
+        rhs.flatten()
+    )
+    model.setParam('OutputFlag', 0)
+    model.optimize()
+    if model.status != grb.GRB.Status.OPTIMAL:
+        raise ValueError('Progressive hedging subproblem not solved to optimality')
+    sol_X = np.reshape(X.X, (n_components, n_stages, n_scenarios))
+    sol_Y = np.reshape(Y.X, (n_items, n_stages, n_scenarios))
+    sol_L = np.reshape(L.X, (n_items, n_stages, n_scenarios))
+    sol_I = np.reshape(I.X, (n_components, n_stages, n_scenarios))
+    profit = (
+        np.einsum('i,its->s', data['profits'], sol_Y)
+        - np.einsum('i,its->s', data['lost_sales'], sol_L)
+        - np.einsum('c,cts->s', data['costs'], sol_X)
+        - np.einsum('c,cts->s', data['holding_costs'], sol_I)
+    )
+    model.dispose()
+    return sol_X, sol_Y, profit
+
+
+class AtoRPMultiStage_PH(AtoTree, AtoG_multi):
+    """
+    The same model of AtoRPMultiStage solved by progressive hedging.
+    Each root-to-leaf scenario of the tree is an independent LP (chunks of chunk_size scenarios
+    are solved together, possibly by a pool of n_workers processes), while the nonanticipativity of
+    the production and of the sales on the shared nodes is enforced by the penalty updates.
+
+    The setting may contain:
+    -rho_factor -> scale of the initial cost-proportional penalties (default 0.1)
+    -adaptive_rho -> if True (default), the penalty of each component is doubled when its primal residual is more than
+        ten times its dual residual and halved in the opposite case (residual balancing)
+    -tolerance -> relative primal residual (distance from the nonanticipative solution) and relative dual residual
+        (movement of the latter, weighted by the penalties, w.r.t. the costs) to stop (default 1e-4)
+    -max_iterations -> maximum number of iterations (default 200)
+    -chunk_size, n_workers -> scenarios per subproblem and number of processes
+    With warm_start, the multipliers, the penalties and the nonanticipative solution of the last solve initialize the next one,
+    as long as the branching factors are the same.
+    The solution is the nonanticipative one and the objective function is evaluated on it. After solve, self.converged
+    tells whether the tolerance has been reached: if not (max_iterations or time_limit), a RuntimeWarning is raised.
+    """
+    def __init__(self, **setting):
+        super().__init__(**setting)
+        self.name = "RPMultiStage_PH"
+        self.branching_factors = setting['branching_factors']
+        self.seas = 1 # no seasonality
+        self.current = 0 # only needed if seasonal
+        self.rho_factor = self.setting.get('rho_factor', 0.1)
+        self.adaptive_rho = self.setting.get('adaptive_rho', True)
+        self.tolerance = self.setting.get('tolerance', 1e-4)
+        self.max_iterations = self.setting.get('max_iterations', 200)
+        self.chunk_size = self.setting.get('chunk_size', 10)
+        self.n_workers = self.setting.get('n_workers', 1)
+        self.pool = None
+        self.n_iterations = 0
+        self.converged = False
+
+    def populate(self, instance, scenarios, present_demand):
+        """
+        It builds the scenario tree and the data of the subproblems.
+        """
+        scenario_tree = self.build_tree(instance, scenarios, present_demand)
+        n_stages = len(self.branching_factors) + 1
+        # node of each scenario (leaf) at each stage
+        self.node_of = scenario_tree.get_scenario_paths()
+        self.node_prob = scenario_tree.prob
+        self.probs = self.node_prob[self.node_of[:, -1]]
+        self.obs = np.transpose(scenario_tree.obs[:, self.node_of], (0, 2, 1))
+        self.data = {
+            'gozinto': np.array(instance.gozinto, dtype=float),
+            'processing_time': np.array(instance.processing_time, dtype=float),
+            'availability': np.array(instance.availability, dtype=float),
+            'inventory': np.array(instance.inventory, dtype=float),
+            'costs': np.array(instance.costs, dtype=float),
+            'profits': np.array(instance.profits, dtype=float),
+            'lost_sales': np.array(instance.lost_sales, dtype=float),
+            'holding_costs': instance.holding_costs * np.ones(instance.n_components)
+        }
+        self.n_stages = n_stages
+        return scenario_tree
+
+    def node_average(self, values):
+        """
+        It returns the nonanticipative (expected over the scenarios of each node) version of
+        the decisions in (n_rows x n_stages x n_scenarios), with the same shape, and its value per node.
+        """
+        n_rows = values.shape[0]
+        node_values = np.zeros((n_rows, self.node_prob.size))
+        for t in range(self.n_stages):
+            np.add.at(node_values.T, self.node_of[:, t], (values[:, t, :] * self.probs).T)
+        node_values /= self.node_prob
+        return np.transpose(node_values[:, self.node_of], (0, 2, 1)), node_values
+
+    def solve_scenarios(self, W_X, W_Y, xbar_X, xbar_Y, rho_X, rho_Y):
+        #it solves the subproblems of all the scenarios, chunk by chunk
+        chunks = [
+            slice(i, i + self.chunk_size)
+            for i in range(0, self.probs.size, self.chunk_size)
+        ]
+        args = [
+            (
+                self.data, self.obs[:, :, c], self.probs[c], W_X[:, :, c], W_Y[:, :, c],
+                xbar_X[:, :, c], xbar_Y[:, :, c], rho_X, rho_Y
+            )
+            for c in chunks
+        ]
+        if self.n_workers > 1 and len(chunks) > 1:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(max_workers=self.n_workers)
+            results = [f.result() for f in [self.pool.submit(solve_scenario_chunk, *a) for a in args]]
+        else:
+            results = [solve_scenario_chunk(*a) for a in args]
+        return (
+            np.concatenate([r[0] for r in results], axis=2),
+            np.concatenate([r[1] for r in results], axis=2),
+            np.concatenate([r[2] for r in results])
+        )
+
+    def solve(
+        self, instance, scenarios, present_demand, time_limit=None, gap=None, verbose=False, warm_start=None
+    ):
+        """
+        Progressive hedging on the scenario tree.
+        :param time_limit: overall time limit of the iterations
+        :param gap: if not None, it overrides the tolerance
+        :param warm_start: if not None, the state (as in self.basis) of a previous solve, i.e., multipliers and penalties.
+            The state of this solve is then saved in self.basis.
+        :return: (of, X, Y, time) with the production and the sales of the root node
+        """
+        start = time.time()
+        tolerance = gap if gap else self.tolerance
+        self.populate(instance, scenarios, present_demand)
+        n_scenarios = self.probs.size
+        shape_X = (instance.n_components, self.n_stages, n_scenarios)
+        if warm_start and warm_start['W_X'].shape == shape_X:
+            # the previous multipliers, penalties and nonanticipative solution are the starting point
+            W_X, W_Y = warm_start['W_X'], warm_start['W_Y']
+            rho_X, rho_Y = warm_start['rho_X'], warm_start['rho_Y']
+            xbar_X, xbar_Y = warm_start['xbar_X'], warm_start['xbar_Y']
+        else:
+            # iteration 0: scenario LPs without the proximal term
+            W_X = np.zeros(shape_X)
+            W_Y = np.zeros((instance.n_items, self.n_stages, n_scenarios))
+            X_s, Y_s, profit = self.solve_scenarios(W_X, W_Y, W_X, W_Y, 0.0, 0.0)
+            xbar_X, _ = self.node_average(X_s)
+            xbar_Y, _ = self.node_average(Y_s)
+            # cost-proportional penalties, scaled by the initial spread of the decisions
+            dev_X = np.sum(self.probs * np.abs(X_s - xbar_X), axis=(1, 2))
+            dev_Y = np.sum(self.probs * np.abs(Y_s - xbar_Y), axis=(1, 2))
+            rho_X = (self.rho_factor * self.data['costs'] / np.maximum(dev_X, 1.0))[:, None, None]
+            rho_Y = (self.rho_factor * self.data['profits'] / np.maximum(dev_Y, 1.0))[:, None, None]
+            W_X = rho_X * (X_s - xbar_X)
+            W_Y = rho_Y * (Y_s - xbar_Y)
+        self.n_iterations = 0
+        self.converged = False
+        while self.n_iterations < self.max_iterations:
+            self.n_iterations += 1
+            X_s, Y_s, profit = self.solve_scenarios(W_X, W_Y, xbar_X, xbar_Y, rho_X, rho_Y)
+            old_X, old_Y = xbar_X, xbar_Y
+            xbar_X, node_X = self.node_average(X_s)
+            xbar_Y, node_Y = self.node_average(Y_s)
+            W_X = W_X + rho_X * (X_s - xbar_X)
+            W_Y = W_Y + rho_Y * (Y_s - xbar_Y)
+            # residuals of each component: distance from nonanticipativity (primal), relative to the size of the decisions,
+            # and movement of the nonanticipative solution weighted by the penalties (dual), relative to the costs
+            size = max(1.0, np.sum(self.probs * np.abs(xbar_X)) + np.sum(self.probs * np.abs(xbar_Y)))
+            size_c = self.n_stages * (np.sum(self.data['costs']) + np.sum(self.data['profits']))
+            primal_X = np.sum(self.probs * np.abs(X_s - xbar_X), axis=(1, 2)) / size
+            primal_Y = np.sum(self.probs * np.abs(Y_s - xbar_Y), axis=(1, 2)) / size
+            dual_X = np.sum(self.probs * rho_X * np.abs(xbar_X - old_X), axis=(1, 2)) / size_c
+            dual_Y = np.sum(self.probs * rho_Y * np.abs(xbar_Y - old_Y), axis=(1, 2)) / size_c
+            primal = np.sum(primal_X) + np.sum(primal_Y)
+            dual = np.sum(dual_X) + np.sum(dual_Y)
+            if verbose:
+                print(f"iteration {self.n_iterations}: primal {primal:.6f}, dual {dual:.6f}, expected profit {self.probs @ profit:.4f}")
+            if primal <= tolerance and dual <= tolerance:
+                self.converged = True
+                break
+            if time_limit and time.time() - start > time_limit:
+                break
+            if self.adaptive_rho:
+                rho_X = rho_X * self.rho_update(primal_X, dual_X)
+                rho_Y = rho_Y * self.rho_update(primal_Y, dual_Y)
+        if not self.converged:
+            warnings.warn(
+                f"Progressive hedging stopped after {self.n_iterations} iterations without converging "
+                f"(primal {primal:.2e}, dual {dual:.2e}, tolerance {tolerance:.2e})",
+                RuntimeWarning
+            )
+        if warm_start is not None:
+            self.basis = {
+                'W_X': W_X, 'W_Y': W_Y, 'rho_X': rho_X, 'rho_Y': rho_Y, 'xbar_X': xbar_X, 'xbar_Y': xbar_Y
+            }
+        self.X = node_X[:, 0]
+        self.Y = node_Y[:, 0]
+        return self.nonanticipative_profit(xbar_X, xbar_Y), self.X, self.Y, time.time() - start
+
+    def rho_update(self, primal, dual, mu=10.0, tau=2.0):
+        #factor of the penalty of each component (residual balancing)
+        factor = np.ones(primal.shape)
+        factor[primal > mu * dual] = tau
+        factor[dual > mu * primal] = 1.0 / tau
+        return factor[:, None, None]
+
+    def nonanticipative_profit(self, xbar_X, xbar_Y):
+        """
+        It returns the expected profit of the nonanticipative production and sales (n_rows x n_stages x n_scenarios),
+        with the lost sales and the inventory they imply on each root-to-leaf scenario.
+        """
+        # the production of a stage is available from the next one
+        supply = np.cumsum(xbar_X, axis=1) - xbar_X
+        used = np.cumsum(np.einsum('ic,its->cts', self.data['gozinto'], xbar_Y), axis=1)
+        I = self.data['inventory'][:, None, None] + supply - used
+        L = self.obs - xbar_Y
+        profit = (
+            np.einsum('i,its->s', self.data['profits'], xbar_Y)
+            - np.einsum('i,its->s', self.data['lost_sales'], L)
+            - np.einsum('c,cts->s', self.data['costs'], xbar_X)
+            - np.einsum('c,cts->s', self.data['holding_costs'], I)
+        )
+        return self.probs @ profit
+
+    def close(self):
+        #it shuts down the pool of processes (if any)
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
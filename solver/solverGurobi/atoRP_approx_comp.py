@@ -2,6 +2,8 @@
 from solver.solverGurobi.atoG_multi import AtoG_multi
 import gurobipy as grb
 import numpy as np
+import scipy.sparse as sp
+from solver.atoBlocks import scenario_kron, scenario_copy, scenario_weights
 
 
 class AtoRP_approx_comp(AtoG_multi):
@@ -28,11 +30,9 @@ class AtoRP_approx_comp(AtoG_multi):
         
     def populate(self, instance, scenarios, present_demand):
         n_scenarios = scenarios.shape[1]
-        pi_s = 1.0 / (n_scenarios + 0.0)
+        pi_s = np.ones(n_scenarios) / (n_scenarios + 0.0)
         ###
-        items = range(instance.n_items)
         components = range(instance.n_components)
-        machines = range(instance.n_machines)
         ###
         n_breakpoints = []
         for i in components:
@@ -46,6 +46,7 @@ class AtoRP_approx_comp(AtoG_multi):
         X = model.addMVar(
             shape=instance.n_components,
             vtype=grb.GRB.CONTINUOUS,
+            obj=-instance.costs, # first stage costs
             name='X'
         )
         #inventory
@@ -58,28 +59,33 @@ class AtoRP_approx_comp(AtoG_multi):
         Y = model.addMVar(
             shape=(instance.n_items, n_scenarios),
             vtype=grb.GRB.CONTINUOUS,
+            obj=scenario_weights(instance.profits, pi_s), #sold items
             name='Y'
         )
         Y_0 = model.addMVar(
             shape=instance.n_items,
             vtype=grb.GRB.CONTINUOUS,
+            obj=instance.profits,
             name='Y_0'
         )
         #lost sale variable
         L = model.addMVar(
             shape=(instance.n_items, n_scenarios),
             vtype=grb.GRB.CONTINUOUS,
+            obj=-scenario_weights(instance.lost_sales, pi_s), #Lost sales
             name='L'
         )
         L_0 = model.addMVar(
             shape=instance.n_items,
             vtype=grb.GRB.CONTINUOUS,
+            obj=-instance.lost_sales,
             name='L_0'
         )
         #Z are the components not sold
         Z = model.addMVar(
             shape=(instance.n_components, n_scenarios),
             vtype=grb.GRB.CONTINUOUS,
+            obj=-scenario_weights(instance.holding_costs*np.ones(instance.n_components), pi_s), #holding costs 
             name='Z'
         )
         #M are the components not sold projected on the 
@@ -90,67 +96,79 @@ class AtoRP_approx_comp(AtoG_multi):
             name='M'
         )
         # Piecewise decomposition of M variables
+        # (the objective contains the approximated value function).
+        # Each segment is bounded by the distance between its breakpoints, the last one is unbounded.
+        # Since the slopes are decreasing, the segments are filled in order.
         M_pw_l = []
         for i in components:
             M_pw = model.addMVar(
                 shape=(n_breakpoints[i],n_scenarios),
                 vtype=grb.GRB.CONTINUOUS,
+                obj=scenario_weights(self.fosva_res[i]['v'], pi_s),
+                ub=scenario_weights(np.append(np.diff(self.fosva_res[i]['u']), grb.GRB.INFINITY), np.ones(n_scenarios)),
                 name='M_pw_'+str(i)
             )
             M_pw_l.append(M_pw)
-        ############ Objective Function
-        #sold items
-        expr = pi_s * sum(
-            instance.profits @ Y[:, s]
-            for s in range(n_scenarios)
-        )
-        #Lost sales
-        expr-= pi_s * sum(
-            instance.lost_sales @ L[:, s]
-            for s in range(n_scenarios)
-        )
-
-        #holding costs 
-        expr-= pi_s *  sum( (instance.holding_costs*np.ones(instance.n_components) ) @ Z[:, s]
-            for s in range(n_scenarios)
-        )
-
-        # first stage costs
-        expr -= instance.costs[:] @ X
-        expr -= instance.lost_sales[:] @ L_0
-        expr += instance.profits[:] @ Y_0
-
-        #Approximated value function
-        for i in components:
-            expr += pi_s * sum(
-                self.fosva_res[i]['v'] @ M_pw_l[i][:,s]
-                for s in range(n_scenarios)
-            )
-
-        model.setObjective(expr, grb.GRB.MAXIMIZE)
+        model.ModelSense = grb.GRB.MAXIMIZE
 
         # Demand constr. and lost sales penalty
-        model.addConstrs((Y[j, :] + L[j, :] == scenarios[j, :] for j in items), name="demand_constr")
-        model.addConstr((Y_0 + L_0 == present_demand), name="init_demand_constr")
+        demand_constr = model.addMConstr(
+            sp.hstack([sp.identity(Y.size), sp.identity(L.size)]),
+            grb.hstack((Y.reshape(-1), L.reshape(-1))),
+            grb.GRB.EQUAL,
+            scenarios.flatten(),
+            name="demand_constr"
+        )
+        init_demand_constr = model.addConstr((Y_0 + L_0 == present_demand), name="init_demand_constr")
         # Capacity constraint for each machine
-        model.addConstrs((instance.processing_time[:, m] @ X <= instance.availability[m] for m in machines),name="processing_time")
+        machine_constr = model.addMConstr(
+            instance.processing_time.T,
+            X,
+            grb.GRB.LESS_EQUAL,
+            instance.availability,
+            name="processing_time"
+        )
         # End items building
-        model.addConstrs((instance.gozinto.T @ Y[:, s] + Z[: ,s] == X + I for s in range(n_scenarios)) , name="end_item_building")        
-        model.addConstr((instance.gozinto.T @ Y_0 + I ==  I_0 ) , name="init_inv")    
-        # Breakpoints ordering
-        for i in components:
-            for s in range(n_scenarios):
-                model.addConstrs((M_pw_l[i][k,s] <= (self.fosva_res[i]['u'][k+1] - self.fosva_res[i]['u'][k]) for k in range(n_breakpoints[i]-1) ), name="concavixation")
-
-        model.addConstrs( (M[i,:]== sum( M_pw_l[i][k,:] for k in range(n_breakpoints[i]) ) for i in components), name="breakpoints" ) 
-        for i in components:
-            model.addConstr((M[i,:] <= Z[i,:]) , name="z_to_m")
+        copy = scenario_copy(instance.n_components, n_scenarios)
+        building_constr = model.addMConstr(
+            sp.hstack([scenario_kron(instance.gozinto.T, n_scenarios), sp.identity(Z.size), -copy, -copy]),
+            grb.hstack((Y.reshape(-1), Z.reshape(-1), X, I)),
+            grb.GRB.EQUAL,
+            np.zeros(Z.size),
+            name="end_item_building"
+        )
+        inv_constr = model.addConstr((instance.gozinto.T @ Y_0 + I ==  I_0 ) , name="init_inv")    
+        # M is the sum of its segments
+        segments_sum = [
+            scenario_kron(np.outer(np.eye(instance.n_components)[i], np.ones(n_breakpoints[i])), n_scenarios)
+            for i in components
+        ]
+        breakpoints_constr = model.addMConstr(
+            sp.hstack([sp.identity(M.size)] + [-mat for mat in segments_sum]),
+            grb.hstack([M.reshape(-1)] + [M_pw_l[i].reshape(-1) for i in components]),
+            grb.GRB.EQUAL,
+            np.zeros(M.size),
+            name="breakpoints"
+        )
+        z_to_m_constr = model.addConstr((M <= Z) , name="z_to_m")
         
         #updateModel
         model.update()
-        model.update()
         self.Y = Y_0
         self.X = X
+        #blocks employed by the warm start
+        self.blocks = {}
+        for name, var in zip(['X', 'I', 'Y', 'Y_0', 'L', 'L_0', 'Z', 'M'], [X, I, Y, Y_0, L, L_0, Z, M]):
+            self.add_block(name, var)
+        for i in components:
+            self.add_block('M_pw_'+str(i), M_pw_l[i])
+        self.add_block('demand_constr', demand_constr, Y.shape)
+        self.add_block('init_demand_constr', init_demand_constr)
+        self.add_block('processing_time', machine_constr)
+        self.add_block('end_item_building', building_constr, Z.shape)
+        self.add_block('init_inv', inv_constr)
+        self.add_block('breakpoints', breakpoints_constr, M.shape)
+        self.add_block('z_to_m', z_to_m_constr)
         return model
 
 
@@ -160,6 +178,7 @@ class AtoRP_approx_comp_v(AtoG_multi):
     ATO problem with recourse
     SAA methodology
     This optimization allows the computation of the approximate value of the inventory by finite differences
+    or by the duals of the inventory_link constraints (I == I_0), i.e., the slopes w.r.t. the initial inventory.
     """
     def __init__(self,**setting):
         super().__init__(**setting)
@@ -167,10 +186,8 @@ class AtoRP_approx_comp_v(AtoG_multi):
         
     def populate(self, instance, scenarios, present_demand = []):
         n_scenarios = scenarios.shape[1]
-        pi_s = 1.0 / (n_scenarios + 0.0)
+        pi_s = np.ones(n_scenarios) / (n_scenarios + 0.0)
         ###
-        items = range(instance.n_items)
-        machines = range(instance.n_machines)
         I_0 = np.array(instance.inventory)
         # model initialisation
         model = grb.Model(self.name)
@@ -178,55 +195,76 @@ class AtoRP_approx_comp_v(AtoG_multi):
         X = model.addMVar(
             shape=instance.n_components,
             vtype=grb.GRB.CONTINUOUS,
+            obj=-instance.costs, # first stage costs
             name='X'
         )
         #production variable
         Y = model.addMVar(
             shape=(instance.n_items, n_scenarios),
             vtype=grb.GRB.CONTINUOUS,
+            obj=scenario_weights(instance.profits, pi_s), #sold items
             name='Y'
         )
 
-        #production variable
+        #components not sold
         Z = model.addMVar(
             shape=(instance.n_components, n_scenarios),
             vtype=grb.GRB.CONTINUOUS,
-            name='Y'
+            obj=-scenario_weights(instance.holding_costs*np.ones(instance.n_components), pi_s), # holding costs on the inentory tested for the value
+            name='Z'
         )
         #lost sale variable
         L = model.addMVar(
             shape=(instance.n_items, n_scenarios),
             vtype=grb.GRB.CONTINUOUS,
+            obj=-scenario_weights(instance.lost_sales, pi_s), #Lost sales
             name='L'
         )
-
-        #sold items
-        expr = pi_s * sum(
-            instance.profits @ Y[:, s]
-            for s in range(n_scenarios)
+        #initial inventory (fixed by inventory_link)
+        I = model.addMVar(
+            shape=instance.n_components,
+            vtype=grb.GRB.CONTINUOUS,
+            lb=-grb.GRB.INFINITY,
+            name='I'
         )
+        model.ModelSense = grb.GRB.MAXIMIZE
 
-        #Lost sales
-        expr-= pi_s * sum(
-            instance.lost_sales @ L[:, s]
-            for s in range(n_scenarios)
+        #number of sold items cannot be more than the demand
+        demand_constr = model.addMConstr(
+            sp.hstack([sp.identity(Y.size), sp.identity(L.size)]),
+            grb.hstack((Y.reshape(-1), L.reshape(-1))),
+            grb.GRB.EQUAL,
+            scenarios.flatten(),
+            name="demand_constr"
         )
-
-        # holding costs on the inentory tested for the value
-        expr-= pi_s * sum(
-            instance.holding_costs*np.ones(instance.n_components) @ Z[:, s]
-            for s in range(n_scenarios)
+        # Capacity constraint for each machine
+        machine_constr = model.addMConstr(
+            instance.processing_time.T,
+            X,
+            grb.GRB.LESS_EQUAL,
+            instance.availability,
+            name="processing_time"
         )
-
-        # first stage costs
-        expr -= instance.costs[:] @ X
-
-        model.setObjective(expr, grb.GRB.MAXIMIZE)
-
-        model.addConstrs((Y[j, :] + L[j, :] == scenarios[j, :] for j in items), name="demand_constr") #number of sold items cannot be more than the demand
-        model.addConstrs(instance.processing_time[:, m] @ X <= instance.availability[m] for m in machines) # Capacity constraint for each machine
-        model.addConstrs(instance.gozinto.T @ Y[:, s] + Z[:, s] == X + I_0 for s in range(n_scenarios))  #components and end items connection
+        #components and end items connection
+        copy = scenario_copy(instance.n_components, n_scenarios)
+        building_constr = model.addMConstr(
+            sp.hstack([scenario_kron(instance.gozinto.T, n_scenarios), sp.identity(Z.size), -copy, -copy]),
+            grb.hstack((Y.reshape(-1), Z.reshape(-1), X, I)),
+            grb.GRB.EQUAL,
+            np.zeros(Z.size),
+            name="end_item_building"
+        )
+        #the dual of each row is the slope of the objective w.r.t. the initial inventory of a component
+        self.inventory_link = model.addConstr((I == I_0), name="inventory_link")
         model.update()
         self.Y = Y
         self.X = X
+        #blocks employed by the warm start
+        self.blocks = {}
+        for name, var in zip(['X', 'Y', 'Z', 'L', 'I'], [X, Y, Z, L, I]):
+            self.add_block(name, var)
+        self.add_block('demand_constr', demand_constr, Y.shape)
+        self.add_block('processing_time', machine_constr)
+        self.add_block('end_item_building', building_constr, Z.shape)
+        self.add_block('inventory_link', self.inventory_link)
         return model
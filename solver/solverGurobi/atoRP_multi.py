@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 from solver.solverGurobi.atoG_multi import AtoG_multi
-import gurobipy as grb
 import numpy as np
+from solver.solverLP import atoRP_multi
+from solver.atoBlocks import scenario_weights
 
 
 class AtoRP_multi(AtoG_multi):
@@ -9,92 +10,61 @@ class AtoRP_multi(AtoG_multi):
     ATO problem with recourse
     SAA methodology
     This multi version includes Lost Sales and Holding Costs
+
+    With the 'persistent' setting, the model is built once and, period after period,
+    only the demand, the present demand and the initial inventory are updated in place.
+    The instance (costs, gozinto, machines) is assumed to be the same among calls.
+    The spare scenario blocks are reserved geometrically: when the scenarios exceed the blocks,
+    the model is built again with (at least) twice the blocks, so a history that grows by one scenario
+    per period requires a logarithmic number of builds. The optional 'persistent_headroom' setting
+    adds spare blocks to the first model as well.
+    The model is the LinearProgram of solverLP.AtoRP_multi.
     """
     def __init__(self,**setting):
         super().__init__(**setting)
         self.name = "RP_multi"
-        
+        self.definition = atoRP_multi.AtoRP_multi(**setting)
+        self.headroom = self.setting.get('persistent_headroom', 0)
+        self.n_blocks = 0
+        self.n_scenarios = 0
+
     def populate(self, instance, scenarios, present_demand):
-        items = range(instance.n_items)
-        machines = range(instance.n_machines)
         n_scenarios = scenarios.shape[1]
-        I_0 = np.array(instance.inventory)
-        # model initialisation
-        model = grb.Model(self.name)
-        # X are first stage solutions, common to every stochastic type of this problem
-        X = model.addMVar(
-            shape=instance.n_components,
-            vtype=grb.GRB.CONTINUOUS,
-            name='X'
-        )
-        I = model.addMVar(
-            shape=instance.n_components,
-            vtype=grb.GRB.CONTINUOUS,
-            name='I'
-        )
-        #Z are the components not sold
-        Z = model.addMVar(
-            shape=(instance.n_components, n_scenarios),
-            vtype=grb.GRB.CONTINUOUS,
-            name='Z'
-        )
-        #production variable
-        Y = model.addMVar(
-            shape=(instance.n_items, n_scenarios),
-            vtype=grb.GRB.CONTINUOUS,
-            name='Y'
-        )
-        #production variable
-        Y_0 = model.addMVar(
-            shape=instance.n_items,
-            vtype=grb.GRB.CONTINUOUS,
-            name='Y_0'
-        )
-        #lost sale variable
-        L = model.addMVar(
-            shape=(instance.n_items, n_scenarios),
-            vtype=grb.GRB.CONTINUOUS,
-            name='L'
-        )
-        #production variable
-        L_0 = model.addMVar(
-            shape=instance.n_items,
-            vtype=grb.GRB.CONTINUOUS,
-            name='L_0'
-        )
-        # crude Montecarlo is deployed (room for generalisation)
-        pi_s = 1.0 / (n_scenarios + 0.0)
-        #
-        expr = pi_s * sum(
-            instance.profits @ Y[:, s]
-            for s in range(n_scenarios)
-        )
-
-        expr-= pi_s * sum(
-            instance.lost_sales @ L[:, s]
-            for s in range(n_scenarios)
-        )
-
-
-        expr-= pi_s *  sum( (instance.holding_costs*np.ones(instance.n_components) ) @ Z[:, s]
-            for s in range(n_scenarios)
-        )
-
-        # first stage costs
-        expr -= instance.costs[:] @ X
-        expr -= instance.lost_sales[:] @ L_0
-        expr += instance.profits[:] @ Y_0
-
-        model.setObjective(expr, grb.GRB.MAXIMIZE)
-
-        # Capacity constraint for each machine
-        model.addConstrs((Y[j, :] + L[j, :] == scenarios[j, :] for j in items), name="demand_constr")
-        model.addConstr((Y_0 + L_0 == present_demand), name="demand_constr")
-        model.addConstrs(instance.processing_time[:, m] @ X <= instance.availability[m] for m in machines)
-        model.addConstrs(instance.gozinto.T @ Y[:, s] + Z[: ,s] == X + I for s in range(n_scenarios))
-        model.addConstr((instance.gozinto.T @ Y_0 + I ==  I_0 ) , name="init_inv") 
+        #scenario blocks of the model (the spare ones are deactivated), doubled w.r.t. the previous model
+        n_blocks = max(n_scenarios + self.headroom, 2 * self.n_blocks) if self.persistent else n_scenarios
+        lp = self.definition.populate(instance, scenarios, present_demand, n_blocks)
+        model, variables, constraints = self.build(lp)
+        self.Y = variables['Y_0']
+        self.X = variables['X']
+        #handles employed by the in-place update
+        self.Y_s = variables['Y']
+        self.L_s = variables['L']
+        self.Z_s = variables['Z']
+        self.demand_constr = constraints['demand_constr']
+        self.present_constr = constraints['present_constr']
+        self.inv_constr = constraints['init_inv']
+        self.n_blocks = n_blocks
+        self.n_scenarios = n_scenarios
+        return model
 
-        model.update()
-        self.Y = Y_0
-        self.X = X
+    def update(self, instance, scenarios, present_demand):
+        """
+        It updates the persistent model with the new scenarios, present demand and inventory.
+        The model is built again (with twice the blocks) only when the scenarios exceed the available blocks.
+        """
+        n_scenarios = scenarios.shape[1]
+        if n_scenarios > self.n_blocks:
+            return self.populate(instance, scenarios, present_demand)
+        model = self.model
+        #demand of the scenarios (unused blocks have zero demand)
+        self.change_rhs(model, self.definition.pad(scenarios, self.n_blocks))
+        self.present_constr.RHS = present_demand
+        self.inv_constr.RHS = np.array(instance.inventory)
+        if n_scenarios != self.n_scenarios:
+            #new probabilities of the scenarios
+            pi_s = self.definition.probabilities(n_scenarios, self.n_blocks)
+            self.Y_s.Obj = scenario_weights(instance.profits, pi_s)
+            self.L_s.Obj = -scenario_weights(instance.lost_sales, pi_s)
+            self.Z_s.Obj = -scenario_weights(instance.holding_costs*np.ones(instance.n_components), pi_s)
+            self.n_scenarios = n_scenarios
         return model
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+from solver.solverGurobi.atoG_multi import AtoG_multi
+from solver.atoRecourse import AtoRecourse
+import gurobipy as grb
+import numpy as np
+import scipy.sparse as sp
+import time
+
+
+class AtoRP_multi_LShaped(AtoG_multi):
+    """
+    ATO problem with recourse (the same of AtoRP_multi) solved by the L-shaped method.
+    The master problem contains the first stage (X, I, Y_0, L_0) and one variable theta per group of scenarios,
+    bounding the expected recourse of the group. The recourse of the scenarios is solved by AtoRecourse,
+    whose duals give the optimality cuts (the recourse is always feasible, no feasibility cut is needed).
+
+    The setting may contain:
+    -n_cuts -> number of groups of scenarios, i.e., of cuts per iteration (default 50, multi-cut)
+    -tolerance -> relative gap between the bounds to stop (default 1e-6)
+    -max_iterations -> maximum number of iterations (default 200)
+    -chunk_size, n_workers, backend -> employed by AtoRecourse
+    The size of the master depends on n_cuts and on the iterations only, not on the number of scenarios.
+    """
+    def __init__(self,**setting):
+        super().__init__(**setting)
+        self.name = "RP_multi_LShaped"
+        self.n_cuts = self.setting.get('n_cuts', 50)
+        self.tolerance = self.setting.get('tolerance', 1e-6)
+        self.max_iterations = self.setting.get('max_iterations', 200)
+        self.recourse = None
+        self.n_iterations = 0
+
+    def populate(self, instance, scenarios, present_demand):
+        n_scenarios = scenarios.shape[1]
+        n_groups = min(self.n_cuts, n_scenarios)
+        #scenarios of each group (contiguous slices)
+        self.groups = np.array_split(np.arange(n_scenarios), n_groups)
+        I_0 = np.array(instance.inventory)
+        #the recourse is built once (with its pool of processes, if any), but it always reads the current instance
+        if self.recourse is None:
+            self.recourse = AtoRecourse(
+                instance,
+                chunk_size=self.setting.get('chunk_size', 500),
+                n_workers=self.setting.get('n_workers', 1),
+                backend=self.setting.get('backend', 'highs')
+            )
+        else:
+            self.recourse.set_instance(instance)
+        # model initialisation
+        model = grb.Model(self.name)
+        # X are first stage solutions, common to every stochastic type of this problem
+        X = model.addMVar(
+            shape=instance.n_components,
+            vtype=grb.GRB.CONTINUOUS,
+            obj=-instance.costs, # first stage costs
+            name='X'
+        )
+        I = model.addMVar(
+            shape=instance.n_components,
+            vtype=grb.GRB.CONTINUOUS,
+            name='I'
+        )
+        Y_0 = model.addMVar(
+            shape=instance.n_items,
+            vtype=grb.GRB.CONTINUOUS,
+            obj=instance.profits,
+            name='Y_0'
+        )
+        L_0 = model.addMVar(
+            shape=instance.n_items,
+            vtype=grb.GRB.CONTINUOUS,
+            obj=-instance.lost_sales,
+            name='L_0'
+        )
+        #expected recourse of each group, bounded by selling the whole demand
+        pi_s = np.ones(n_scenarios) / (n_scenarios + 0.0)
+        max_profit = pi_s * (instance.profits @ scenarios)
+        theta = model.addMVar(
+            shape=n_groups,
+            vtype=grb.GRB.CONTINUOUS,
+            lb=-grb.GRB.INFINITY,
+            ub=np.array([np.sum(max_profit[g]) for g in self.groups]),
+            obj=np.ones(n_groups),
+            name='theta'
+        )
+        model.ModelSense = grb.GRB.MAXIMIZE
+
+        model.addConstr((Y_0 + L_0 == present_demand), name="demand_constr")
+        # Capacity constraint for each machine
+        model.addMConstr(
+            instance.processing_time.T,
+            X,
+            grb.GRB.LESS_EQUAL,
+            instance.availability,
+            name="processing_time"
+        )
+        model.addConstr((instance.gozinto.T @ Y_0 + I ==  I_0 ) , name="init_inv")
+        model.update()
+        self.X = X
+        self.Y = Y_0
+        self.I = I
+        self.theta = theta
+        return model
+
+    def add_cuts(self, model, supply, profit, duals):
+        """
+        It adds one optimality cut per group:
+        theta_g <= sum_{s in g} pi_s (Q_s + duals_s @ (X + I - supply))
+        """
+        n_scenarios = profit.size
+        slopes = np.array([np.sum(duals[:, g], axis=1) for g in self.groups]) / n_scenarios
+        intercepts = np.array([np.sum(profit[g]) for g in self.groups]) / n_scenarios - slopes @ supply
+        model.addMConstr(
+            sp.hstack([sp.identity(len(self.groups)), -sp.csr_matrix(slopes), -sp.csr_matrix(slopes)]),
+            grb.hstack((self.theta, self.X, self.I)),
+            grb.GRB.LESS_EQUAL,
+            intercepts,
+            name="optimality_cut"
+        )
+
+    def solve(
+        self, instance, scenarios, present_demand, time_limit=None, gap=None, verbose=False, warm_start=None
+    ):
+        """
+        L-shaped method: the master is solved, the recourse is evaluated on its solution and the cuts are added
+        until the upper bound (master) and the lower bound (best evaluated solution) are close enough.
+        :param time_limit: overall time limit of the iterations
+        :param gap: if not None, it overrides the tolerance
+        :param warm_start: not employed, the master is re-optimized from its previous basis at each iteration
+        :return: (of, X, Y_0, time) as AtoRP_multi
+        """
+        start = time.time()
+        tolerance = gap if gap else self.tolerance
+        model = self.populate(instance, scenarios, present_demand)
+        model.setParam('OutputFlag', 0)
+        best_of, best_X, best_Y = -np.inf, [], []
+        self.n_iterations = 0
+        while self.n_iterations < self.max_iterations:
+            model.optimize()
+            if model.status != grb.GRB.Status.OPTIMAL:
+                break
+            self.n_iterations += 1
+            upper_bound = model.ObjVal
+            supply = self.X.X + self.I.X
+            res = self.recourse.solve(supply, scenarios)
+            #value of the master solution with its actual recourse
+            of = upper_bound - np.sum(self.theta.X) + np.mean(res['profit'])
+            if of > best_of:
+                best_of, best_X, best_Y = of, self.X.X, self.Y.X
+            if verbose:
+                print(f"iteration {self.n_iterations}: lower bound {best_of:.4f}, upper bound {upper_bound:.4f}")
+            if upper_bound - best_of <= tolerance * max(1.0, abs(upper_bound)):
+                break
+            if time_limit and time.time() - start > time_limit:
+                break
+            self.add_cuts(model, supply, res['profit'], res['duals'])
+        model.dispose()
+        if len(best_X) == 0:
+            return -1, [], [], time.time() - start
+        return best_of, best_X, best_Y, time.time() - start
+
+    def close(self):
+        #it shuts down the pool of processes of the recourse (if any)
+        if self.recourse is not None:
+            self.recourse.close()
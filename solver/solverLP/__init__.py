@@ -0,0 +1,19 @@
+from .atoLP import AtoLP
+from .atoLP_multi import AtoLP_multi
+from .atoCVaR import AtoCVaR
+from .atoCVaRProfit import AtoCVaRProfit
+from .atoRP import AtoRP
+from .atoRP_multi import AtoRP_multi
+from .atoPI import AtoPI
+from .atoRPMultiStage import AtoRPMultiStage
+
+__all__ = [
+    "AtoLP",
+    "AtoLP_multi",
+    "AtoCVaR",
+    "AtoCVaRProfit",
+    "AtoRP",
+    "AtoRP_multi",
+    "AtoPI",
+    "AtoRPMultiStage"
+]
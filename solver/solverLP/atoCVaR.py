@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import scipy.sparse as sp
+from solver.solverLP.atoLP import AtoLP
+from solver.linearProgram import LinearProgram
+from solver.atoBlocks import scenario_kron, scenario_copy, scenario_dot, scenario_weights
+
+
+class AtoCVaR(AtoLP):
+    """   
+    CVar version of the ATO problem
+    @@@Currently, it does not support the inventory@@@
+    """
+    def __init__(self,**setting):
+        super().__init__(**setting)
+        self.name = "ato_CVaR"
+        #level of the c value at risk
+        self.alpha = self.setting["CVaR_alpha"]
+        #minimum expected profit
+        self.expected_profit = self.setting["CVaR_expected_profit"]
+
+    def populate(self, instance, scenarios):
+        n_scenarios = scenarios.shape[1]
+        lp = LinearProgram(self.name, maximize=False)
+        #probability of a scenario
+        pi_s = np.ones(n_scenarios) / (n_scenarios + 0.0)
+        #variables of the value at risk formulation (CV@R objective function formulation)
+        lp.add_var('zeta', 1, obj=1.0, lb=-np.inf)
+        lp.add_var('Z', n_scenarios, obj=1.0 / (1.0 - self.alpha) * pi_s)
+        #production decision: number of components
+        lp.add_var('X', instance.n_components)
+        #sold items in the second stage per scenario
+        lp.add_var('Y', (instance.n_items, n_scenarios))
+
+        #number of sold items cannot be more than the demand
+        lp.add_constr("demand_constr", {'Y': sp.identity(instance.n_items * n_scenarios)}, '<', scenarios)
+        #machine availability constraint
+        lp.add_constr("processing_time", {'X': instance.processing_time.T}, '<', instance.availability)
+        #components and end items connection
+        lp.add_constr(
+            "end_item_building",
+            {
+                'Y': scenario_kron(instance.gozinto.T, n_scenarios),
+                'X': -scenario_copy(instance.n_components, n_scenarios)
+            },
+            '<',
+            np.zeros(instance.n_components * n_scenarios)
+        )
+        #CV@R formulation
+        lp.add_constr(
+            "cvar",
+            {
+                'X': scenario_copy(1, n_scenarios) @ sp.csr_matrix(instance.costs),
+                'Y': -scenario_dot(instance.profits, n_scenarios),
+                'zeta': -np.ones((n_scenarios, 1)),
+                'Z': -sp.identity(n_scenarios)
+            },
+            '<',
+            np.zeros(n_scenarios)
+        )
+        #constraint on the minimum expected net profit
+        lp.add_constr(
+            "mean_earning",
+            {
+                'Y': scenario_weights(instance.profits, pi_s).reshape(1, -1),
+                'X': -np.reshape(instance.costs, (1, -1))
+            },
+            '>',
+            self.expected_profit
+        )
+        return lp
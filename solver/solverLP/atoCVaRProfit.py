@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import scipy.sparse as sp
+from solver.solverLP.atoLP import AtoLP
+from solver.linearProgram import LinearProgram
+from solver.atoBlocks import scenario_kron, scenario_copy, scenario_dot, scenario_weights
+
+
+class AtoCVaRProfit(AtoLP):
+    """   
+    It maximizes the expected net profit while bounding the \text{CVaR}_{\alpha}
+    """
+    def __init__(self,**setting):
+        super().__init__(**setting)
+        self.name = "atoProfitCVaR"
+        #level of the c value at risk
+        self.alpha = self.setting["atoProfitCVaR_alpha"]
+        #bound on the Cvar
+        self.atoProfitCVaR_limit = self.setting["atoProfitCVaR_limit"]
+
+    def populate(self, instance, scenarios):
+        I_0 = np.array(instance.inventory)
+        n_scenarios = scenarios.shape[1]
+        lp = LinearProgram(self.name, maximize=True)
+        #probability of a scenario
+        pi_s = np.ones(n_scenarios) / (n_scenarios + 0.0)
+        #variables of the value at risk formulation
+        lp.add_var('zeta', 1, lb=-np.inf)
+        lp.add_var('Z', n_scenarios)
+        #production decision: number of components (first stage costs)
+        lp.add_var('X', instance.n_components, obj=-instance.costs)
+        #sold items in the second stage per scenario (second stage profits)
+        lp.add_var('Y', (instance.n_items, n_scenarios), obj=scenario_weights(instance.profits, pi_s))
+
+        #number of sold items cannot be more than the demand
+        lp.add_constr("demand_constr", {'Y': sp.identity(instance.n_items * n_scenarios)}, '<', scenarios)
+        #machine availability constraint
+        lp.add_constr("processing_time", {'X': instance.processing_time.T}, '<', instance.availability)
+        #components and end items connection
+        lp.add_constr(
+            "end_item_building",
+            {
+                'Y': scenario_kron(instance.gozinto.T, n_scenarios),
+                'X': -scenario_copy(instance.n_components, n_scenarios)
+            },
+            '<',
+            np.repeat(I_0, n_scenarios)
+        )
+        #CV@R formulation
+        lp.add_constr(
+            "cvar",
+            {
+                'X': scenario_copy(1, n_scenarios) @ sp.csr_matrix(instance.costs),
+                'Y': -scenario_dot(instance.profits, n_scenarios),
+                'zeta': -np.ones((n_scenarios, 1)),
+                'Z': -sp.identity(n_scenarios)
+            },
+            '<',
+            np.zeros(n_scenarios)
+        )
+        #constraint on the maximum CV@R
+        lp.add_constr(
+            "cvar_limit",
+            {
+                'zeta': np.ones((1, 1)),
+                'Z': 1.0 / (1.0 - self.alpha) * pi_s.reshape(1, -1)
+            },
+            '<',
+            self.atoProfitCVaR_limit
+        )
+        return lp
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+from solver.Ato import Ato
+
+class AtoLP(Ato):
+    """
+    Interface (super-class) of assembly-to-order solver in matrix form. Specifications in the subclasses.
+    The model is built once as a LinearProgram and then solved by the backend in the setting:
+    'highs' (scipy, default) or 'gurobi'.
+    """
+    def __init__(self,**setting):
+        self.name = "atoLP"
+        self.setting = setting
+        self.backend = self.setting.get('backend', 'highs')
+        # no basis is kept by the backends (see solve), the simplex iterations of the last solve
+        self.basis = None
+        self.iter_count = 0
+
+    def populate(self, instance, scenarios):
+        #it initializes the LinearProgram.
+        pass
+
+    def get_solution(self, instance, lp, time_limit=None, gap=None, verbose=False):
+        #This method solves the LinearProgram, while the different subclasses 
+        #modify the population method (thus the characteristics of a particular model)
+        #gap is accepted for compatibility with AtoG, but all the models are continuous
+        if verbose:
+            print ('Solving a model with: '+str(lp.n_constrs)+' constraints')
+            print ('    and: ' +str(lp.n_vars)+ ' variables')
+        sol = lp.solve(backend=self.backend, time_limit=time_limit, verbose=verbose)
+        self.iter_count = sol.iterations
+        if sol.optimal:
+            return sol.of, list(sol.get_value('X')), sol.comp_time
+        else:
+            return -1, [], sol.comp_time
+
+    def solve(
+        self, instance, scenarios, time_limit=None, gap=None, verbose=False, warm_start=None
+    ):
+        """
+        Solve is the method where the problem is stated and then solved.
+        :param instance: the dictionary where there is all relevant information for the model building
+        :param time_limit: to interrupt the solver with a non optimal solution in case of strict time schedule
+        :param gap: not employed, all the models are continuous
+        :param verbose: verbose or not output of the backend
+        :param warm_start: ignored, accepted for compatibility with AtoG_multi (self.basis stays None)
+        :return: first stage solution in a dict_data['n_components'] array
+        """
+        lp = self.populate(instance, scenarios)
+        return self.get_solution(instance, lp, time_limit=time_limit, gap=gap, verbose=verbose)
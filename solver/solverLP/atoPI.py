@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import scipy.sparse as sp
+from solver.solverLP.atoLP_multi import AtoLP_multi
+from solver.linearProgram import LinearProgram
+from solver.atoBlocks import scenario_kron
+
+
+class AtoPI(AtoLP_multi):
+    """
+    Version of the ATO where we know in advance the demand and so we can produce optimally. Used for the calculation of
+    the EVPI (Expected Value of Perfect Information)
+    """
+    def __init__(self, **setting):
+        super().__init__(**setting)
+        self.name = "atoPerfectInfo"
+
+    def populate(self, instance, scenarios, present_demand=None):
+        n_time_steps = scenarios.shape[1]
+        #initial inventory
+        I_0 = np.array(instance.inventory)
+        #selection of the first and of the last time step, and time shift of the evolution
+        first = sp.csr_matrix(([1.0], ([0], [0])), shape=(1, n_time_steps))
+        last = sp.csr_matrix(([1.0], ([0], [n_time_steps - 1])), shape=(1, n_time_steps))
+        shift = sp.eye(n_time_steps - 1, n_time_steps, k=1) - sp.eye(n_time_steps - 1, n_time_steps)
+        previous = sp.eye(n_time_steps - 1, n_time_steps)
+
+        lp = LinearProgram("ato_perfect_information", maximize=True)
+        # components considered (components cost)
+        lp.add_var('X', (instance.n_components, n_time_steps), obj=-np.outer(instance.costs, np.ones(n_time_steps)))
+        # sold items (profits)
+        lp.add_var('Y', (instance.n_items, n_time_steps), obj=np.outer(instance.profits, np.ones(n_time_steps)))
+        # lost sales (lost sales cost)
+        lp.add_var('L', (instance.n_items, n_time_steps), obj=-np.outer(instance.lost_sales, np.ones(n_time_steps)))
+        #inventory variable (holding costs)
+        lp.add_var('I', (instance.n_components, n_time_steps), obj=-np.outer(instance.holding_costs*np.ones(instance.n_components), np.ones(n_time_steps)))
+
+        # Capacity constraint for each machine
+        lp.add_constr(
+            "processing_time",
+            {'X': scenario_kron(instance.processing_time.T, n_time_steps)},
+            '<',
+            np.repeat(instance.availability, n_time_steps)
+        )
+        # Y bounds
+        lp.add_constr(
+            "demand_item",
+            {'Y': sp.identity(scenarios.size), 'L': sp.identity(scenarios.size)},
+            '=',
+            scenarios
+        )
+        # Initial condition
+        lp.add_constr(
+            "initial_condition",
+            {'I': sp.kron(sp.identity(instance.n_components), first), 'Y': sp.kron(instance.gozinto.T, first)},
+            '=',
+            I_0
+        )
+        # Evolution
+        if n_time_steps > 1:
+            lp.add_constr(
+                "evolution",
+                {
+                    'I': sp.kron(sp.identity(instance.n_components), shift),
+                    'Y': sp.kron(instance.gozinto.T, sp.eye(n_time_steps - 1, n_time_steps, k=1)),
+                    'X': -sp.kron(sp.identity(instance.n_components), previous)
+                },
+                '=',
+                np.zeros(instance.n_components * (n_time_steps - 1))
+            )
+        #final inv
+        lp.add_constr(
+            "final_inv",
+            {'I': sp.kron(sp.identity(instance.n_components), last), 'X': sp.kron(sp.identity(instance.n_components), last)},
+            '>',
+            I_0
+        )
+        return lp
+
+    def get_decisions(self, sol):
+        #production and sales all over the horizon
+        return sol.get_value('X'), sol.get_value('Y')
+
+    def solve(
+        self, instance, scenarios, time_limit=None, gap=None, verbose=False
+    ):
+        """
+        It solves the perfect information problem on the whole horizon of scenarios.
+        :return: production and sales in (n_components x n_time_steps) and (n_items x n_time_steps) arrays
+        """
+        lp = self.populate(instance, scenarios)
+        return self.get_solution(instance, lp, time_limit=time_limit, gap=gap, verbose=verbose)
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import scipy.sparse as sp
+from solver.solverLP.atoLP import AtoLP
+from solver.linearProgram import LinearProgram
+from solver.atoBlocks import scenario_kron, scenario_copy, scenario_weights
+
+class AtoRP(AtoLP):
+    """
+    Standard Two-Stage stochastic LP model with recourse of the ATO problem,
+    treated with the well-konwn Sampling Average Approximation (SAA).
+    """
+    def __init__(self,**setting):
+        super().__init__(**setting)
+        self.name = "RP"
+        
+    def populate(self, instance, scenarios):
+        n_scenarios = scenarios.shape[1]
+        I_0 = np.array(instance.inventory)
+        lp = LinearProgram(self.name, maximize=True)
+        # SAA plain probabilities 
+        pi_s = np.ones(n_scenarios) / (n_scenarios + 0.0)
+        # X are first stage solutions (first stage costs)
+        lp.add_var('X', instance.n_components, obj=-instance.costs)
+        #sold items in the second stage per scenario (second stage profits)
+        lp.add_var('Y', (instance.n_items, n_scenarios), obj=scenario_weights(instance.profits, pi_s))
+
+        #number of sold items cannot be more than the demand
+        lp.add_constr("demand_constr", {'Y': sp.identity(instance.n_items * n_scenarios)}, '<', scenarios)
+        #machine availability constraint
+        lp.add_constr("processing_time", {'X': instance.processing_time.T}, '<', instance.availability)
+        #components and end items connection
+        lp.add_constr(
+            "end_item_building",
+            {
+                'Y': scenario_kron(instance.gozinto.T, n_scenarios),
+                'X': -scenario_copy(instance.n_components, n_scenarios)
+            },
+            '<',
+            np.repeat(I_0, n_scenarios)
+        )
+        return lp
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import scipy.sparse as sp
+from solver.solverLP.atoLP_multi import AtoLP_multi
+from solver.linearProgram import LinearProgram
+from solver.atoTree import AtoTree
+from solver.atoBlocks import scenario_kron, scenario_weights
+
+
+class AtoRPMultiStage(AtoTree, AtoLP_multi):
+    """
+    Standard version of the ATO problem, see the companion paper for the explicit model
+    """
+    def __init__(self, **setting):
+        super().__init__(**setting)
+        self.name = "RPMultiStage"
+        self.branching_factors = setting['branching_factors']
+        self.seas = 1 # no seasonality
+        self.current = 0 # only needed if seasonal
+
+    def populate(self, instance, scenarios, present_demand):
+        scenario_tree = self.build_tree(instance, scenarios, present_demand)
+        return self.populate_tree(instance, scenario_tree)
+
+    def populate_tree(self, instance, scenario_tree):
+        #it builds the LinearProgram on a given scenario tree
+        n_nodes = scenario_tree.n_nodes
+        probs = scenario_tree.prob
+        obs = scenario_tree.obs
+        #selection of the nodes (but the root) and of their parents
+        children = sp.eye(n_nodes - 1, n_nodes, k=1, format='csr')
+        ancestors = sp.csr_matrix(
+            (np.ones(n_nodes - 1), (np.arange(n_nodes - 1), scenario_tree.parent[1:])),
+            shape=(n_nodes - 1, n_nodes)
+        )
+        root = sp.csr_matrix(([1.0], ([0], [0])), shape=(1, n_nodes))
+        #initial inventory
+        I_0 = np.array(instance.inventory)
+
+        lp = LinearProgram(self.name, maximize=True)
+        #production decision: number of components (root node)
+        lp.add_var('X', instance.n_components)
+        #dummy decision made on future stages (components cost)
+        lp.add_var('X_ms', (instance.n_components, n_nodes), obj=-scenario_weights(instance.costs, probs))
+        # sold items per node (profits)
+        lp.add_var('Y', (instance.n_items, n_nodes), obj=scenario_weights(instance.profits, probs))
+        # lost sales per node (lost sales cost)
+        lp.add_var('L', (instance.n_items, n_nodes), obj=-scenario_weights(instance.lost_sales, probs))
+        #inventory variable (holding costs)
+        lp.add_var('I', (instance.n_components, n_nodes), obj=-scenario_weights(instance.holding_costs*np.ones(instance.n_components), probs))
+
+        # Capacity constraint for each machine
+        lp.add_constr(
+            "processing_time",
+            {'X_ms': scenario_kron(instance.processing_time.T, n_nodes)},
+            '<',
+            np.repeat(instance.availability, n_nodes).reshape(instance.n_machines, n_nodes)
+        )
+        # Y bounds
+        lp.add_constr(
+            "demand_constr",
+            {'Y': sp.identity(obs.size), 'L': sp.identity(obs.size)},
+            '=',
+            obs
+        )
+        # Initial condition
+        lp.add_constr(
+            "initial_condition",
+            {'I': sp.kron(sp.identity(instance.n_components), root), 'Y': sp.kron(instance.gozinto.T, root)},
+            '=',
+            I_0
+        )
+        #root node definition
+        lp.add_constr(
+            "X_def",
+            {'X': sp.identity(instance.n_components), 'X_ms': -sp.kron(sp.identity(instance.n_components), root)},
+            '=',
+            np.zeros(instance.n_components)
+        )
+        # Evolution (one row per component and node but the root)
+        if n_nodes > 1:
+            lp.add_constr(
+                "evolution",
+                {
+                    'I': sp.kron(sp.identity(instance.n_components), children - ancestors),
+                    'Y': sp.kron(instance.gozinto.T, children),
+                    'X_ms': -sp.kron(sp.identity(instance.n_components), ancestors)
+                },
+                '=',
+                np.zeros((instance.n_components, n_nodes - 1))
+            )
+        return lp
+
+    def get_decisions(self, sol):
+        #production decision and sales of the root node
+        return sol.get_value('X'), sol.get_value('Y')[:, 0]
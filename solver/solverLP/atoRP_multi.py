@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import scipy.sparse as sp
+from solver.solverLP.atoLP_multi import AtoLP_multi
+from solver.linearProgram import LinearProgram
+from solver.atoBlocks import scenario_kron, scenario_copy, scenario_weights
+
+
+class AtoRP_multi(AtoLP_multi):
+    """
+    ATO problem with recourse
+    SAA methodology
+    This multi version includes Lost Sales and Holding Costs
+
+    The model can reserve n_blocks >= n_scenarios scenario blocks: the spare ones have zero probability
+    and zero demand, such that they can be filled later in place (see solverGurobi.AtoRP_multi).
+    """
+    def __init__(self,**setting):
+        super().__init__(**setting)
+        self.name = "RP_multi"
+
+    def populate(self, instance, scenarios, present_demand, n_blocks=None):
+        n_scenarios = scenarios.shape[1]
+        if n_blocks is None:
+            n_blocks = n_scenarios
+        I_0 = np.array(instance.inventory)
+        # crude Montecarlo is deployed (room for generalisation)
+        pi_s = self.probabilities(n_scenarios, n_blocks)
+        lp = LinearProgram(self.name, maximize=True)
+        # X are first stage solutions (first stage costs)
+        lp.add_var('X', instance.n_components, obj=-instance.costs)
+        lp.add_var('I', instance.n_components)
+        #Z are the components not sold (holding costs)
+        lp.add_var('Z', (instance.n_components, n_blocks), obj=-scenario_weights(instance.holding_costs*np.ones(instance.n_components), pi_s))
+        #sold items
+        lp.add_var('Y', (instance.n_items, n_blocks), obj=scenario_weights(instance.profits, pi_s))
+        lp.add_var('Y_0', instance.n_items, obj=instance.profits)
+        #lost sales
+        lp.add_var('L', (instance.n_items, n_blocks), obj=-scenario_weights(instance.lost_sales, pi_s))
+        lp.add_var('L_0', instance.n_items, obj=-instance.lost_sales)
+
+        # Demand and lost sales
+        lp.add_constr(
+            "demand_constr",
+            {'Y': sp.identity(instance.n_items * n_blocks), 'L': sp.identity(instance.n_items * n_blocks)},
+            '=',
+            self.pad(scenarios, n_blocks)
+        )
+        lp.add_constr(
+            "present_constr",
+            {'Y_0': sp.identity(instance.n_items), 'L_0': sp.identity(instance.n_items)},
+            '=',
+            present_demand
+        )
+        # Capacity constraint for each machine
+        lp.add_constr("processing_time", {'X': instance.processing_time.T}, '<', instance.availability)
+        # End items building
+        copy = scenario_copy(instance.n_components, n_blocks)
+        lp.add_constr(
+            "end_item_building",
+            {
+                'Y': scenario_kron(instance.gozinto.T, n_blocks),
+                'Z': sp.identity(instance.n_components * n_blocks),
+                'X': -copy,
+                'I': -copy
+            },
+            '=',
+            np.zeros((instance.n_components, n_blocks))
+        )
+        lp.add_constr(
+            "init_inv",
+            {'Y_0': instance.gozinto.T, 'I': sp.identity(instance.n_components)},
+            '=',
+            I_0
+        )
+        return lp
+
+    def probabilities(self, n_scenarios, n_blocks):
+        #probabilities of the scenarios, zero on the spare blocks
+        pi_s = np.zeros(n_blocks)
+        pi_s[:n_scenarios] = 1.0 / (n_scenarios + 0.0)
+        return pi_s
+
+    def pad(self, scenarios, n_blocks):
+        #scenarios with a zero demand on the spare blocks
+        padded = np.zeros((scenarios.shape[0], n_blocks))
+        padded[:, :scenarios.shape[1]] = scenarios
+        return padded
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+# Shared fixtures of the tests: run them from the root of the repository with python -m pytest tests
+import os
+import sys
+import json
+import pytest
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from instances import InstanceRandom
+from sampler import GaussianSampler, MultiStageSampler
+
+
+def make_instance(n_items=6, n_components=8, seed=0):
+    """
+    Small instance (and its sampler) of the etc settings, such that every model stays
+    below the size limits of the restricted Gurobi license.
+    """
+    with open(os.path.join(ROOT, 'etc', 'instance_Params.json'), 'r') as fp:
+        sim_setting = json.load(fp)
+    with open(os.path.join(ROOT, 'etc', 'sampler_Params.json'), 'r') as fp:
+        smpl_setting = json.load(fp)
+    sim_setting['n_items'] = n_items
+    smpl_setting['n_items'] = n_items
+    sim_setting['n_components'] = n_components
+    sim_setting['dict_gozinto'] = {
+        "name": "standard", "factor": [2, 10], "n_items_per_family": [3, 2],
+        "n_common_components_per_family": 1, "n_components_per_family": [4, 3],
+        "n_outcast_items": 1, "p_outcast_component": 0.3
+    }
+    sim_setting['initial_inventory'] = [0] * n_components
+    sim_setting['seed'] = seed
+    smpl_setting['seed'] = seed
+    sam = MultiStageSampler(smpl_setting, GaussianSampler(smpl_setting))
+    instance = InstanceRandom(sim_setting, sam)
+    return instance, sam
+
+
+@pytest.fixture
+def small_instance():
+    instance, sam = make_instance()
+    # half of the expected component requirements in stock
+    instance.inventory = 0.5 * np.mean(sam.sample(12), axis=1) @ instance.gozinto
+    return instance, sam
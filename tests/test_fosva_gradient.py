@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+import importlib
+import pytest
+import numpy as np
+
+pytest.importorskip('gurobipy')
+from solver.solverGurobi import AtoRP_approx_comp_v
+from FOSVA import compute_gradient, compute_gradient_rhs, compute_gradient_dual
+
+EPS = 1e-4
+
+
+@pytest.fixture
+def gradient_setting(small_instance):
+    instance, sam = small_instance
+    demand = sam.sample(12)
+    np.random.seed(1)
+    mean_demand_component = np.mean(demand, axis=1) @ instance.gozinto
+    points = [
+        np.random.uniform(0.05, 4, size=mean_demand_component.shape) * mean_demand_component
+        for _ in range(3)
+    ]
+    # integer inventories, likely on the border of the RHS ranges (degenerate points)
+    points.append(np.round(demand[:, 0] @ instance.gozinto).astype(float))
+    return instance, demand, points
+
+
+def test_dual_gradient_matches_finite_differences(gradient_setting):
+    instance, demand, points = gradient_setting
+    prb = AtoRP_approx_comp_v()
+    for point in points:
+        fd_pos, fd_neg = compute_gradient(instance, point.copy(), prb, demand, EPS)
+        du_pos, du_neg = compute_gradient_dual(instance, point.copy(), prb, demand, EPS)
+        np.testing.assert_allclose(du_pos, fd_pos, rtol=1e-4, atol=1e-3)
+        np.testing.assert_allclose(du_neg, fd_neg, rtol=1e-4, atol=1e-3)
+        # concavity of the value function
+        assert np.all(du_pos <= du_neg + 1e-6)
+
+
+def test_rhs_gradient_matches_finite_differences(gradient_setting):
+    instance, demand, points = gradient_setting
+    prb = AtoRP_approx_comp_v()
+    for point in points:
+        fd_point, rhs_point = point.copy(), point.copy()
+        fd_pos, fd_neg = compute_gradient(instance, fd_point, prb, demand, 0.1)
+        rhs_pos, rhs_neg = compute_gradient_rhs(instance, rhs_point, prb, demand, 0.1)
+        np.testing.assert_allclose(rhs_pos, fd_pos, rtol=1e-6, atol=1e-6)
+        np.testing.assert_allclose(rhs_neg, fd_neg, rtol=1e-6, atol=1e-6)
+        # the inventory is back to the nominal point, as in compute_gradient
+        np.testing.assert_array_equal(rhs_point, fd_point)
+
+
+@pytest.mark.parametrize('batch_size', [1, 2])
+def test_pool_closed_on_failure(monkeypatch, small_instance, batch_size):
+    # the pool of processes of the gradient is shut down even if multi_fosva raises
+    fosva_ato = importlib.import_module('FOSVA.fosva_ato')
+    instance, sam = small_instance
+    closed = []
+    def failing_multi_fosva(**kwargs):
+        raise RuntimeError('multi_fosva failed')
+    def close(self):
+        closed.append(type(self))
+        self.pool.shutdown()
+    monkeypatch.setattr(fosva_ato, 'multi_fosva', failing_multi_fosva)
+    monkeypatch.setattr(fosva_ato.ParallelGradient, 'close', close)
+    monkeypatch.setattr(fosva_ato.BatchGradient, 'close', close)
+    with pytest.raises(RuntimeError):
+        fosva_ato.run_multifosva_ato(
+            instance, AtoRP_approx_comp_v(), sam.sample(12), EPS, lambda k: 0.1, 1,
+            n_workers=2, batch_size=batch_size
+        )
+    assert len(closed) == 1
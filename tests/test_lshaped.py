@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+import pytest
+import numpy as np
+
+grb = pytest.importorskip('gurobipy')
+from solver.solverGurobi import AtoRP_multi, AtoRP_multi_LShaped
+from conftest import make_instance
+
+
+def test_lshaped_matches_extensive_form(small_instance):
+    instance, sam = small_instance
+    scenarios = sam.sample(30)
+    of, _, _, _ = AtoRP_multi().solve(instance, scenarios, scenarios[:, 0])
+    with AtoRP_multi_LShaped(n_cuts=5) as prb:
+        of_ls, _, _, _ = prb.solve(instance, scenarios, scenarios[:, 0])
+    assert of_ls == pytest.approx(of, rel=1e-5)
+
+
+def test_lshaped_new_instance(small_instance):
+    # a solver that is employed on another instance does not keep the recourse data of the first one
+    instance, sam = small_instance
+    other, _ = make_instance(seed=1)
+    other.inventory = np.array(instance.inventory)
+    scenarios = sam.sample(30)
+    with AtoRP_multi_LShaped(n_cuts=5) as prb:
+        prb.solve(instance, scenarios, scenarios[:, 0])
+        of_ls, _, _, _ = prb.solve(other, scenarios, scenarios[:, 0])
+    of, _, _, _ = AtoRP_multi().solve(other, scenarios, scenarios[:, 0])
+    assert of_ls == pytest.approx(of, rel=1e-5)
@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_import_without_gurobipy():
+    # gurobipy is optional: the packages are imported in a fresh interpreter where it cannot be found
+    code = (
+        "import sys; sys.modules['gurobipy'] = None\n"
+        "import solver, FOSVA, utils.utils, agents\n"
+        "assert solver.solverGurobi is None\n"
+    )
+    res = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True)
+    assert res.returncode == 0, res.stderr
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+import pytest
+import numpy as np
+
+grb = pytest.importorskip('gurobipy')
+from solver.solverGurobi import AtoRP_multi
+
+
+def rolling_horizon(instance, prb, history, demand, inventory):
+    """
+    Objective values of prb period after period: the history grows by the demand of each period
+    and the inventory changes. It returns them with the models solved by prb.
+    """
+    ofs = []
+    models = []
+    for t in range(demand.shape[1]):
+        instance.inventory = inventory * (1 + 0.1 * t)
+        of, _, _, _ = prb.solve(instance, history, demand[:, t])
+        ofs.append(of)
+        models.append(prb.model)
+        history = np.column_stack((history, demand[:, t]))
+    return np.array(ofs), models
+
+
+def test_persistent_matches_rebuild(small_instance):
+    instance, sam = small_instance
+    history = sam.sample(20)
+    demand = sam.sample(6)
+    inventory = np.array(instance.inventory)
+    rebuilt, _ = rolling_horizon(instance, AtoRP_multi(), history, demand, inventory)
+    prb = AtoRP_multi(persistent=True)
+    ofs, models = rolling_horizon(instance, prb, history, demand, inventory)
+    assert np.all(ofs != -1)
+    assert np.allclose(ofs, rebuilt, rtol=1e-7)
+    # the blocks are doubled when the history exceeds them: one build for 20 scenarios, one for 21 to 40
+    assert len(set(map(id, models))) == 2
+    assert prb.n_blocks == 40
+
+
+def test_persistent_headroom(small_instance):
+    instance, sam = small_instance
+    history = sam.sample(10)
+    demand = sam.sample(4)
+    inventory = np.array(instance.inventory)
+    rebuilt, _ = rolling_horizon(instance, AtoRP_multi(), history, demand, inventory)
+    prb = AtoRP_multi(persistent=True, persistent_headroom=5)
+    ofs, models = rolling_horizon(instance, prb, history, demand, inventory)
+    assert np.allclose(ofs, rebuilt, rtol=1e-7)
+    # the first model already fits the whole horizon
+    assert len(set(map(id, models))) == 1
+    assert prb.n_blocks == 15
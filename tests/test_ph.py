@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+import pytest
+import numpy as np
+
+grb = pytest.importorskip('gurobipy')
+from solver.solverGurobi import AtoRPMultiStage, AtoRPMultiStage_PH
+
+
+@pytest.mark.parametrize('branching_factors', [[3, 1], [3, 2]])
+def test_ph_matches_multistage(small_instance, branching_factors):
+    # the tree is built from the same draws of the sampler, hence the seeds
+    instance, sam = small_instance
+    history = sam.sample(60)
+    np.random.seed(1)
+    of, X, _, _ = AtoRPMultiStage(branching_factors=branching_factors).solve(instance, history, history[:, -1])
+    np.random.seed(1)
+    prb = AtoRPMultiStage_PH(branching_factors=branching_factors, chunk_size=1)
+    ph_of, ph_X, _, _ = prb.solve(instance, history, history[:, -1])
+    assert prb.converged
+    assert ph_of == pytest.approx(of, rel=1e-4)
+    assert np.allclose(ph_X, X, rtol=1e-2, atol=5)
+
+
+def test_ph_warns_without_convergence(small_instance):
+    instance, sam = small_instance
+    history = sam.sample(60)
+    prb = AtoRPMultiStage_PH(branching_factors=[3, 1], chunk_size=1, max_iterations=2)
+    with pytest.warns(RuntimeWarning):
+        prb.solve(instance, history, history[:, -1])
+    assert not prb.converged
+    assert prb.n_iterations == 2
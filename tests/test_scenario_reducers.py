@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+import pytest
+import numpy as np
+
+from scenarioReducer import Fast_forward_W2, Backward_W2, SimultaneousBackward_W2, KMedoids_W2, distance_matrix, extend_distance_matrix, nearest
+
+
+@pytest.fixture
+def scenarios():
+    rng = np.random.RandomState(0)
+    return rng.gamma(2, 50, size=(4, 60))
+
+
+def check_reduction(scenarios, reduced, probs, n_scenarios):
+    # the reduced set is made of n_scenarios distinct scenarios of the initial set, with valid probabilities
+    assert reduced.shape == (scenarios.shape[0], n_scenarios)
+    assert probs.shape == (n_scenarios,)
+    assert np.all(probs >= 0)
+    assert np.sum(probs) == pytest.approx(1)
+    indx = [int(np.flatnonzero(np.all(scenarios.T == col, axis=1))[0]) for col in reduced.T]
+    assert len(set(indx)) == n_scenarios
+    return indx
+
+
+def test_distance_matrix(scenarios):
+    diff = scenarios[:, :, None] - scenarios[:, None, :]
+    expected = np.sqrt(np.sum(diff ** 2, axis=0))
+    np.testing.assert_allclose(distance_matrix(scenarios), expected, rtol=1e-10, atol=1e-8)
+    # blocks of a few rows give the same matrix (up to the rounding of BLAS)
+    np.testing.assert_allclose(distance_matrix(scenarios, block_memory=1000), expected, rtol=1e-10, atol=1e-8)
+    np.testing.assert_allclose(distance_matrix(scenarios, dtype=np.float32), expected, rtol=1e-3, atol=1e-2)
+
+
+@pytest.mark.parametrize('n_scenarios', [1, 5, 15])
+def test_fast_forward(scenarios, n_scenarios):
+    reduced, probs = Fast_forward_W2(scenarios).reduce(n_scenarios)
+    check_reduction(scenarios, reduced, probs, n_scenarios)
+    # a precomputed distance matrix gives the same reduction
+    dist = distance_matrix(scenarios)
+    reduced_pre, probs_pre = Fast_forward_W2(scenarios, dist_mtrx=dist).reduce(n_scenarios)
+    np.testing.assert_array_equal(reduced_pre, reduced)
+    np.testing.assert_array_equal(probs_pre, probs)
+
+
+def fast_forward_reference(dist, n_scenarios):
+    # scenario-by-scenario fast forward selection on a uniform distribution
+    N = dist.shape[0]
+    dist = dist.copy()
+    probs = np.ones(N) / N
+    indxR = []
+    for it in range(n_scenarios):
+        zeta = [np.inf if u in indxR else probs @ dist[u, :] for u in range(N)]
+        u = int(np.argmin(zeta))
+        indxR.append(u)
+        probs[u] = 0
+        dist = np.minimum(dist, dist[u, :])
+    return indxR
+
+
+@pytest.mark.parametrize('n_scenarios', [1, 5, 15])
+def test_fast_forward_selection(scenarios, n_scenarios):
+    # the vectorized selection picks the scenarios of the scenario-by-scenario one, in the same order
+    reduced, _ = Fast_forward_W2(scenarios).reduce(n_scenarios)
+    indxR = fast_forward_reference(distance_matrix(scenarios), n_scenarios)
+    np.testing.assert_array_equal(reduced, scenarios[:, indxR])
+
+
+def backward_reference(dist, n_scenarios):
+    # removal of one scenario at a time, its probability moves to the closest remaining one
+    N = dist.shape[0]
+    probs = np.ones(N) / N
+    alive = list(range(N))
+    while len(alive) > n_scenarios:
+        _, l = min((probs[l] * min(dist[l, j] for j in alive if j != l), l) for l in alive)
+        _, j = min((dist[l, j], j) for j in alive if j != l)
+        probs[j] += probs[l]
+        probs[l] = 0
+        alive.remove(l)
+    return alive
+
+
+def simultaneous_backward_reference(dist, n_scenarios):
+    # removal of the scenario that least increases the distance of all the removed ones from the remaining set
+    N = dist.shape[0]
+    probs = np.ones(N) / N
+    removed = []
+    while N - len(removed) > n_scenarios:
+        best = None
+        for l in range(N):
+            if l in removed:
+                continue
+            keep = [j for j in range(N) if j not in removed + [l]]
+            zeta = sum(probs[k] * dist[k, keep].min() for k in removed + [l])
+            if best is None or zeta < best[0] - 1e-12:
+                best = (zeta, l)
+        removed.append(best[1])
+    return sorted(set(range(N)) - set(removed))
+
+
+@pytest.mark.parametrize('reducer', [Backward_W2, SimultaneousBackward_W2])
+@pytest.mark.parametrize('n_scenarios', [1, 20, 59])
+def test_backward(scenarios, reducer, n_scenarios):
+    reduced, probs = reducer(scenarios).reduce(n_scenarios)
+    check_reduction(scenarios, reduced, probs, n_scenarios)
+    # a precomputed distance matrix gives the same reduction
+    dist = distance_matrix(scenarios)
+    reduced_pre, probs_pre = reducer(scenarios, dist_mtrx=dist).reduce(n_scenarios)
+    np.testing.assert_array_equal(reduced_pre, reduced)
+    np.testing.assert_array_equal(probs_pre, probs)
+
+
+@pytest.mark.parametrize('reducer, reference', [
+    (Backward_W2, backward_reference),
+    (SimultaneousBackward_W2, simultaneous_backward_reference),
+])
+def test_backward_selection(reducer, reference):
+    # the incremental updates remove the scenarios of the reference implementations
+    rng = np.random.RandomState(1)
+    for it in range(5):
+        N = rng.randint(4, 20)
+        n_scenarios = rng.randint(1, N)
+        scenarios = rng.gamma(2, 50, size=(rng.randint(1, 6), N))
+        reduced, _ = reducer(scenarios).reduce(n_scenarios)
+        indxR = reference(distance_matrix(scenarios), n_scenarios)
+        np.testing.assert_array_equal(reduced, scenarios[:, indxR])
+
+
+def test_nearest(scenarios):
+    centers = scenarios[:, [3, 10, 42]]
+    dist = distance_matrix(scenarios)[:, [3, 10, 42]]
+    indx, sq_dist = nearest(scenarios, centers, chunk_size=7)
+    np.testing.assert_array_equal(indx, np.argmin(dist, axis=1))
+    np.testing.assert_allclose(sq_dist, np.min(dist, axis=1) ** 2, rtol=1e-8, atol=1e-6)
+
+
+@pytest.mark.parametrize('n_scenarios', [1, 5, 15])
+def test_kmedoids(scenarios, n_scenarios):
+    reducer = KMedoids_W2(scenarios, batch_size=32, chunk_size=16, seed=0)
+    reduced, probs = reducer.reduce(n_scenarios)
+    check_reduction(scenarios, reduced, probs, n_scenarios)
+    # each scenario moves its probability to the closest selected one
+    closest, sq_dist = nearest(scenarios, reduced)
+    np.testing.assert_allclose(probs, np.bincount(closest, minlength=n_scenarios) / scenarios.shape[1])
+    assert reducer.w2_error >= 0
+    assert reducer.w2_error == pytest.approx(np.sqrt(np.mean(sq_dist)))
+    # the same seed gives the same reduction
+    reduced_seed, probs_seed = KMedoids_W2(scenarios, batch_size=32, chunk_size=16, seed=0).reduce(n_scenarios)
+    np.testing.assert_array_equal(reduced_seed, reduced)
+    np.testing.assert_array_equal(probs_seed, probs)
+
+
+def test_kmedoids_duplicates():
+    # fewer distinct scenarios than the reduced cardinality
+    scenarios = np.repeat(np.array([[1., 2.], [3., 4.]]), 5, axis=1)
+    reduced, probs = KMedoids_W2(scenarios, seed=0).reduce(4)
+    assert reduced.shape == (2, 4)
+    assert np.sum(probs) == pytest.approx(1)
+    assert np.all(probs >= 0)
+
+
+def test_extend_distance_matrix(scenarios):
+    # the distances of the first 40 scenarios are kept, the ones of the last 20 are added
+    dist = extend_distance_matrix(distance_matrix(scenarios[:, :40]), scenarios)
+    assert dist.shape == (60, 60)
+    old = distance_matrix(scenarios[:, :40])
+    np.testing.assert_array_equal(dist[:40, :40], old)
+    np.testing.assert_array_equal(dist[40:, :], dist[:, 40:].T)
+    np.testing.assert_allclose(dist, distance_matrix(scenarios), rtol=1e-10, atol=1e-8)
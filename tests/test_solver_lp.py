@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+import pytest
+import numpy as np
+
+import solver.solverLP as P
+
+grb = pytest.importorskip('gurobipy')
+import solver.solverGurobi as G
+
+CVAR_SETTING = {'CVaR_alpha': 0.9, 'CVaR_expected_profit': -1e6}
+PROFIT_CVAR_SETTING = {'atoProfitCVaR_alpha': 0.9, 'atoProfitCVaR_limit': 1e6}
+
+
+@pytest.mark.parametrize('name, setting', [
+    ('AtoRP', {}),
+    ('AtoCVaR', CVAR_SETTING),
+    ('AtoCVaRProfit', PROFIT_CVAR_SETTING),
+])
+def test_two_stage_objectives(small_instance, name, setting):
+    instance, sam = small_instance
+    scenarios = sam.sample(30)
+    g_of, _, _ = getattr(G, name)(**setting).solve(instance, scenarios)
+    p_of, _, _ = getattr(P, name)(**setting).solve(instance, scenarios)
+    assert g_of != -1
+    assert p_of == pytest.approx(g_of, rel=1e-6)
+
+
+def test_rolling_horizon_objective(small_instance):
+    instance, sam = small_instance
+    scenarios = sam.sample(30)
+    g_of, _, _, _ = G.AtoRP_multi().solve(instance, scenarios, scenarios[:, 0])
+    p_of, _, _, _ = P.AtoRP_multi().solve(instance, scenarios, scenarios[:, 0])
+    assert p_of == pytest.approx(g_of, rel=1e-6)
+
+
+@pytest.mark.parametrize('branching_factors', [[3, 1], [2, 2, 2]])
+def test_multistage_objective(small_instance, branching_factors):
+    instance, sam = small_instance
+    scenarios = sam.sample(60)
+    # the scenario tree is sampled, so both backends start from the same seed
+    np.random.seed(1)
+    g_of, _, _, _ = G.AtoRPMultiStage(branching_factors=branching_factors).solve(instance, scenarios, scenarios[:, 0])
+    np.random.seed(1)
+    p_of, _, _, _ = P.AtoRPMultiStage(branching_factors=branching_factors).solve(instance, scenarios, scenarios[:, 0])
+    assert p_of == pytest.approx(g_of, rel=1e-6)
+
+
+def test_perfect_information(small_instance):
+    # both AtoPI return (of, X, Y, time) on the whole horizon, as consumed by PerfectInfoAgent
+    instance, sam = small_instance
+    demand = sam.sample(6)
+    g_of, g_X, g_Y, _ = G.AtoPI().solve(instance, demand)
+    p_of, p_X, p_Y, _ = P.AtoPI().solve(instance, demand)
+    assert p_of == pytest.approx(g_of, rel=1e-6)
+    assert np.shape(p_X) == np.shape(g_X) == (instance.n_components, 6)
+    assert np.shape(p_Y) == np.shape(g_Y) == (instance.n_items, 6)
+
+
+def test_warm_start_is_accepted(small_instance):
+    # the agents may pass a basis, the LinearProgram is solved from scratch anyway
+    instance, sam = small_instance
+    scenarios = sam.sample(30)
+    prb = P.AtoRP_multi()
+    of, _, _, _ = prb.solve(instance, scenarios, scenarios[:, 0], warm_start={})
+    assert of == pytest.approx(P.AtoRP_multi().solve(instance, scenarios, scenarios[:, 0])[0])
+    assert prb.basis is None
+    assert prb.iter_count >= 0
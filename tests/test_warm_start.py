@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+import pytest
+import numpy as np
+
+grb = pytest.importorskip('gurobipy')
+from solver.solverGurobi import AtoRP_multi, AtoRPMultiStage
+
+
+def test_warm_start_matches_cold_solve(small_instance):
+    # the basis of each period initializes the next one, also when the history grows
+    instance, sam = small_instance
+    history = sam.sample(20)
+    demand = sam.sample(5)
+    warm = AtoRP_multi()
+    basis = {}
+    for t in range(demand.shape[1]):
+        cold_of, cold_X, _, _ = AtoRP_multi().solve(instance, history, demand[:, t])
+        of, X, _, _ = warm.solve(instance, history, demand[:, t], warm_start=basis)
+        basis = warm.basis
+        assert of == pytest.approx(cold_of, rel=1e-7)
+        assert set(basis) >= {'X', 'Y', 'demand_constr'}
+        history = np.column_stack((history, demand[:, t]))
+
+
+def test_warm_start_multistage(small_instance):
+    instance, sam = small_instance
+    history = sam.sample(120)
+    prb = AtoRPMultiStage(branching_factors=[3, 2])
+    prb.seasonalize(12)
+    basis = {}
+    for t in range(3):
+        cold = AtoRPMultiStage(branching_factors=[3, 2])
+        cold.seasonalize(12)
+        cold.current = prb.current
+        cold_of, _, _, _ = cold.solve(instance, history, history[:, -1])
+        of, _, _, _ = prb.solve(instance, history, history[:, -1], warm_start=basis)
+        basis = prb.basis
+        assert of == pytest.approx(cold_of, rel=1e-7)
+        prb.updateClock()
+        history = np.column_stack((history, sam.sample(1)))
@@ -0,0 +1,64 @@
+import numpy as np
+
+
+class PiecewiseLinear():
+    """
+    Continuous piecewise linear function defined by its breakpoints and slopes
+    (the slope slopes[k] holds from breaks[k] on, the first segment is slopes[0] * x and the function is 0 before breaks[0]).
+    The intercepts are computed once, then a batch of points is evaluated by searchsorted and a gather.
+    """
+    def __init__(self, breaks, slopes):
+        self.breaks = np.asarray(breaks, dtype=float)
+        self.slopes = np.asarray(slopes, dtype=float)
+        # intercepts for continuity: q_k = q_{k-1} + (slopes[k-1] - slopes[k]) * breaks[k]
+        self.intercepts = np.concatenate(
+            ([0.0], np.cumsum((self.slopes[:-1] - self.slopes[1:]) * self.breaks[1:]))
+        )
+
+    def __call__(self, x):
+        x = np.asarray(x, dtype=float)
+        # segment of each point (-1 before the first breakpoint)
+        k = np.searchsorted(self.breaks, x, side='right') - 1
+        pos = np.maximum(k, 0)
+        return np.where(k >= 0, self.slopes[pos] * x + self.intercepts[pos], 0.0)
+
+
+class PiecewiseLinearSet():
+    """
+    The piecewise linear value functions of all the components (e.g., the output of multi_fosva).
+    Calling it on a (n_components x n_points) array evaluates each row with the function of its component.
+    Breakpoints, slopes and intercepts are stacked in padded 2-D arrays (one row per component, +inf breakpoints
+    as padding, as in ConcavePWLBatch), so all the components are evaluated together: the segment of each point
+    is the number of breakpoints of its row not greater than it, counted by one broadcast comparison.
+    The points are processed in chunks of chunk_size columns, such that at most
+    n_components x chunk_size x max_breakpoints comparisons are in memory.
+    """
+    def __init__(self, fosva_res, chunk_size=4096):
+        functions = [PiecewiseLinear(ele['u'], ele['v']) for ele in fosva_res]
+        width = max(fun.breaks.size for fun in functions)
+        self.breaks = np.full((len(functions), width), np.inf)
+        self.slopes = np.zeros((len(functions), width))
+        self.intercepts = np.zeros((len(functions), width))
+        for i, fun in enumerate(functions):
+            self.breaks[i, :fun.breaks.size] = fun.breaks
+            self.slopes[i, :fun.slopes.size] = fun.slopes
+            self.intercepts[i, :fun.intercepts.size] = fun.intercepts
+        self.chunk_size = chunk_size
+
+    def __call__(self, x):
+        x = np.asarray(x, dtype=float)
+        if x.shape[0] != self.breaks.shape[0]:
+            raise ValueError(f'{self.breaks.shape[0]} rows expected, {x.shape[0]} given')
+        squeeze = x.ndim == 1
+        x = x.reshape(x.shape[0], -1)
+        res = np.empty(x.shape)
+        rows = np.arange(x.shape[0])[:, None]
+        for start in range(0, x.shape[1], self.chunk_size):
+            chunk = x[:, start:start + self.chunk_size]
+            # segment of each point (-1 before the first breakpoint), as searchsorted(side='right') - 1
+            k = np.sum(self.breaks[:, None, :] <= chunk[:, :, None], axis=2) - 1
+            pos = np.maximum(k, 0)
+            res[:, start:start + self.chunk_size] = np.where(
+                k >= 0, self.slopes[rows, pos] * chunk + self.intercepts[rows, pos], 0.0
+            )
+        return res[:, 0] if squeeze else res
@@ -7,17 +7,13 @@ import seaborn as sns
 import pandas as pd
 #
 from itertools import chain
+from utils.piecewise import PiecewiseLinear
 
 def piecewise_function(x, breaks, slopes):
     '''
     A piecewise linear function from breaks a slopes
     '''
-    # ADDING CONDITION FOR CONTINUITY
-    coeff = [(slopes[0], 0)]
-    for i in range(1, len(slopes)):
-        q = coeff[-1][1] + (slopes[i-1]-slopes[i]) * breaks[i]
-        coeff.append( (slopes[i], q) )
-    return np.piecewise(x, [x >= b for b in breaks], [lambda x=x, m=c[0], q=c[1]: m*x + q for c in coeff])
+    return PiecewiseLinear(breaks, slopes)(x)
 
 
 def printMultiHorizon(results, horizon, listToPlot = [] , fig_path=None):